@@ -0,0 +1,54 @@
+"""on delete cascade foreign keys
+
+Revision ID: 3f1a9c2d7b41
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2d7b41'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, referred table) for every foreign key that should cascade on delete
+CASCADE_FOREIGN_KEYS = [
+    ("bookings", "user_id", "users"),
+    ("bookings", "service_id", "services"),
+    ("reviews", "booking_id", "bookings"),
+]
+
+
+def _replace_foreign_keys(ondelete: Union[str, None]) -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing_tables = set(inspector.get_table_names())
+
+    for table, column, referred_table in CASCADE_FOREIGN_KEYS:
+        # fresh databases get their tables from create_all with the cascades already in place
+        if table not in existing_tables:
+            continue
+
+        for foreign_key in inspector.get_foreign_keys(table):
+            if foreign_key["constrained_columns"] == [column]:
+                op.drop_constraint(foreign_key["name"], table, type_="foreignkey")
+
+        op.create_foreign_key(
+            f"{table}_{column}_fkey", table, referred_table, [column], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_foreign_keys("CASCADE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_foreign_keys(None)
@@ -0,0 +1,93 @@
+"""service soft delete and archive tables
+
+Revision ID: 8b2e4d6f0a13
+Revises: 3f1a9c2d7b41
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f0a13'
+down_revision: Union[str, Sequence[str], None] = '3f1a9c2d7b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    existing_tables = set(inspector.get_table_names())
+
+    # fresh databases get services (and the booking_status type) from create_all, which may
+    # already include everything below, so each object is only created if it is missing
+    if "services" in existing_tables:
+        if "deleted_at" not in {column["name"] for column in inspector.get_columns("services")}:
+            op.add_column("services", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+        if "ix_services_live_active_price" not in {index["name"] for index in inspector.get_indexes("services")}:
+            op.create_index(
+                "ix_services_live_active_price", "services", ["is_active", "price"],
+                postgresql_where=sa.text("deleted_at IS NULL")
+            )
+
+    if "archived_services" not in existing_tables:
+        op.create_table(
+            "archived_services",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("title", sa.String(200), nullable=False),
+            sa.Column("description", sa.String(750), nullable=False),
+            sa.Column("price", sa.DECIMAL(precision=10, scale=2), nullable=False),
+            sa.Column("duration_minutes", sa.Integer(), nullable=False),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime(timezone=True)),
+            sa.Column("deleted_at", sa.DateTime(timezone=True)),
+            sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+
+    if "archived_bookings" not in existing_tables:
+        booking_status = postgresql.ENUM("PENDING", "CONFIRMED", "CANCELLED", "COMPLETED", name="booking_status")
+        booking_status.create(op.get_bind(), checkfirst=True)
+        op.create_table(
+            "archived_bookings",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("service_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("start_time", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("end_time", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("status", postgresql.ENUM(name="booking_status", create_type=False), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_archived_bookings_user_id", "archived_bookings", ["user_id"])
+        op.create_index("ix_archived_bookings_service_id", "archived_bookings", ["service_id"])
+
+    if "archived_reviews" not in existing_tables:
+        op.create_table(
+            "archived_reviews",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("booking_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("rating", sa.Integer(), nullable=False),
+            sa.Column("comment", sa.String(1000), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_archived_reviews_booking_id", "archived_reviews", ["booking_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in ("archived_reviews", "archived_bookings", "archived_services"):
+        if inspector.has_table(table):
+            op.drop_table(table)
+    if inspector.has_table("services"):
+        if "ix_services_live_active_price" in {index["name"] for index in inspector.get_indexes("services")}:
+            op.drop_index("ix_services_live_active_price", table_name="services")
+        if "deleted_at" in {column["name"] for column in inspector.get_columns("services")}:
+            op.drop_column("services", "deleted_at")
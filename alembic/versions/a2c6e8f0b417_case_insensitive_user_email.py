@@ -0,0 +1,36 @@
+"""case-insensitive unique user email
+
+Revision ID: a2c6e8f0b417
+Revises: e7a1b3c5d902
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c6e8f0b417'
+down_revision: Union[str, Sequence[str], None] = 'e7a1b3c5d902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # fresh databases get the index from create_all
+    if "users" not in set(sa.inspect(op.get_bind()).get_table_names()):
+        return
+
+    # fails if existing emails differ only by case; merge those accounts first
+    op.create_index("ux_users_email_lower", "users", [sa.text("lower(email)")], unique=True)
+    # the lower(email) index covers exact duplicates too, and ON CONFLICT can only target one of them
+    op.execute("ALTER TABLE users DROP CONSTRAINT IF EXISTS users_email_key")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint("users_email_key", "users", ["email"])
+    op.drop_index("ux_users_email_lower", table_name="users")
@@ -0,0 +1,35 @@
+"""revoked tokens
+
+Revision ID: c4d8e2a6f315
+Revises: 8b2e4d6f0a13
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e2a6f315'
+down_revision: Union[str, Sequence[str], None] = '8b2e4d6f0a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("jti", sa.String(36), primary_key=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"])
+    op.create_index("ix_revoked_tokens_revoked_at", "revoked_tokens", ["revoked_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("revoked_tokens")
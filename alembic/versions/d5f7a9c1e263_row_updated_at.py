@@ -0,0 +1,48 @@
+"""updated_at row versions on services and bookings
+
+Revision ID: d5f7a9c1e263
+Revises: a2c6e8f0b417
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f7a9c1e263'
+down_revision: Union[str, Sequence[str], None] = 'a2c6e8f0b417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    # fresh databases get these columns from create_all
+    for table in ("services", "bookings"):
+        if _missing_updated_at(inspector, table):
+            op.add_column(table, sa.Column(
+                "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+            ))
+
+    # the purge copies every live column into the archive
+    for table in ("archived_services", "archived_bookings"):
+        if _missing_updated_at(inspector, table):
+            op.add_column(table, sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in ("archived_bookings", "archived_services", "bookings", "services"):
+        if inspector.has_table(table) and not _missing_updated_at(inspector, table):
+            op.drop_column(table, "updated_at")
+
+
+def _missing_updated_at(inspector, table: str) -> bool:
+    return inspector.has_table(table) and "updated_at" not in {column["name"] for column in inspector.get_columns(table)}
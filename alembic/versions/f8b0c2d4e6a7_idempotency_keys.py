@@ -0,0 +1,46 @@
+"""idempotency keys
+
+Revision ID: f8b0c2d4e6a7
+Revises: d5f7a9c1e263
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8b0c2d4e6a7'
+down_revision: Union[str, Sequence[str], None] = 'd5f7a9c1e263'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # idempotency_keys references users, which fresh databases only get from create_all
+    if "users" not in set(sa.inspect(op.get_bind()).get_table_names()):
+        return
+
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("route", sa.String(64), primary_key=True),
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("request_hash", sa.String(64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("response_body", sa.LargeBinary(), nullable=True),
+        sa.Column("response_headers", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("idempotency_keys"):
+        op.drop_table("idempotency_keys")
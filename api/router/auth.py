@@ -1,14 +1,20 @@
+from typing import Optional
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from core.database import get_db
+from core.ratelimit import rate_limit
 from crud.user import UserCRUD
 from schema.user import UserCreate, UserResponse, UserLogin
-from core.security import create_access_token, create_refresh_token, verify_token,get_current_user
-from schema.auth import LoginResponse, Token, RefreshTokenRequest
+from core.security import create_access_token, verify_token,get_current_user, revoke_token, security
+from crud.refresh_token import RefreshTokenCRUD
+from schema.auth import LoginResponse, Token, RefreshTokenRequest, LogoutRequest
 from models.user import User
 auth_router = APIRouter(tags=["auth"], prefix="/auth")
 
-@auth_router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@auth_router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED,
+                  dependencies=[Depends(rate_limit("auth"))])
 def register_user(user:UserCreate, db:Session=Depends(get_db)):
     try:
         new_user = UserCRUD.create_user(db,user)
@@ -27,7 +33,8 @@ def register_user(user:UserCreate, db:Session=Depends(get_db)):
 
 
 
-@auth_router.post("/login", response_model=LoginResponse,status_code=status.HTTP_200_OK)
+@auth_router.post("/login", response_model=LoginResponse,status_code=status.HTTP_200_OK,
+                  dependencies=[Depends(rate_limit("auth"))])
 def login(login_data: UserLogin, db:Session = Depends(get_db)):
 
     user = UserCRUD.authenticate(db,login_data.email,login_data.password)
@@ -38,8 +45,8 @@ def login(login_data: UserLogin, db:Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(data={"sub":str(user.id)})
-    refresh_token = create_refresh_token(data = {"sub":str(user.id)})
+    access_token = create_access_token(data={"sub":str(user.id), "role": user.role.value})
+    refresh_token = RefreshTokenCRUD.issue(db, user.id)
 
     return LoginResponse(user=user, tokens=Token(access_token=access_token, refresh_token=refresh_token,token_type="bearer"))
 
@@ -61,24 +68,38 @@ def refresh_token(refresh_request: RefreshTokenRequest, db : Session = Depends(g
             detail="Invalid refresh token"
         )
 
-
-    user = UserCRUD.get_user_by_id(db, user_id)
-    if user is None:
+    # every refresh spends the presented token and hands out its successor
+    try:
+        user_id, role, new_refresh_token = RefreshTokenCRUD.rotate(db, refresh_request.refresh_token, payload)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
+            detail=str(e)
         )
 
-    new_access_token = create_access_token(data={"sub": str(user.id)})
-    return Token(access_token=new_access_token, refresh_token=refresh_request.refresh_token, token_type = "bearer")
+    new_access_token = create_access_token(data={"sub": str(user_id), "role": role.value})
+    return Token(access_token=new_access_token, refresh_token=new_refresh_token, token_type = "bearer")
 
 
 @auth_router.post("/logout", status_code=status.HTTP_200_OK)
-def logout(current_user: User = Depends(get_current_user)):
-    return {
-        "message": "Logout successful",
-        "help": "i dont know how to implement a logout besides the access token expiring😭😭😭😭😭😭"
-    }
+def logout(
+        logout_request: Optional[LogoutRequest] = None,
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+
+    revoke_token(db, verify_token(credentials.credentials, token_type="access"))
+
+    # optionally end the session for good by revoking the refresh token too
+    if logout_request and logout_request.refresh_token:
+        refresh_payload = verify_token(logout_request.refresh_token, token_type="refresh")
+        if refresh_payload and refresh_payload.get("sub") == str(current_user.id):
+            revoke_token(db, refresh_payload)
+            if refresh_payload.get("fam"):
+                RefreshTokenCRUD.revoke_family(db, UUID(refresh_payload["fam"]))
+
+    return {"message": "Logout successful"}
 
 
 
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+
+from core.batch import run_batch
+from core.database import get_db
+from core.security import preload_principal
+from schema.batch import BatchRequest, BatchResponse, BatchResponseItem
+
+batch_router = APIRouter(tags=["batch"])
+
+optional_bearer = HTTPBearer(auto_error=False)
+
+
+def share_principal(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+                    db: Session = Depends(get_db)):
+    # sub-requests then find the caller in principal_cache instead of each loading it
+    preload_principal(credentials, db)
+    # give the connection back to the pool before the sub-requests check out their own
+    db.close()
+
+
+@batch_router.post("/batch", response_model=BatchResponse, status_code=status.HTTP_200_OK,
+                   dependencies=[Depends(share_principal)])
+async def batch(batch_in: BatchRequest, request: Request):
+    """Run up to BATCH_MAX_REQUESTS sub-requests and return every result together.
+
+    Each sub-request goes through the full app with the caller's Authorization header,
+    so auth, rate limits and caching apply exactly as if it were sent on its own.
+    """
+    items = [item.model_dump() for item in batch_in.requests]
+    results = await run_batch(request.app, request.scope, items)
+    return BatchResponse(responses=[
+        BatchResponseItem(id=item["id"], status=result_status, headers=headers, body=body)
+        for item, (result_status, headers, body) in zip(items, results)
+    ])
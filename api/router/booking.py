@@ -1,10 +1,16 @@
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from core.database import get_db
+from core.ratelimit import rate_limit
+from core.conditional import conditional_response, make_etag
+from core.fields import parse_fields, sparse_model
+from core.idempotency import idempotency_store
 from core.security import get_current_user, require_admin
+from core.serialization import json_response
 from crud.booking import BookingCRUD
 from crud.user import UserCRUD
 from models.user import User
@@ -14,34 +20,42 @@ from schema.booking import BookingCreate, BookingUpdate, BookingQuery, BookingRe
 booking_router = APIRouter(tags=["bookings"], prefix="/bookings")
 
 
-@booking_router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
+@booking_router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED,
+                     dependencies=[Depends(rate_limit("booking_write"))])
 def create_booking(
         booking_in: BookingCreate,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
 
-    try:
-        booking = BookingCRUD.create_booking(db, booking_in, current_user.id)
-        return booking
-    except ValueError as e:
-        if "conflicts with existing booking" in str(e):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=str(e)
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e)
-            )
+    def create(commit: bool = True):
+        try:
+            booking = BookingCRUD.create_booking(db, booking_in, current_user.id, commit)
+            return json_response(BookingResponse, booking, status.HTTP_201_CREATED)
+        except ValueError as e:
+            if "conflicts with existing booking" in str(e):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=str(e)
+                )
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+
+    # retries with the same key get the stored response instead of a second booking (or conflict check)
+    return idempotency_store.run(db, current_user.id, "POST /bookings", idempotency_key, booking_in, create)
 
 
 @booking_router.get("/", response_model=List[BookingResponse], status_code=status.HTTP_200_OK)
 def get_bookings(
+        request: Request,
         status_filter: Optional[BookingStatus] = Query(None, alias="status", description="Filter by booking status"),
         from_date: Optional[str] = Query(None, alias="from", description="Filter bookings from this date (ISO format)"),
         to_date: Optional[str] = Query(None, alias="to", description="Filter bookings until this date (ISO format)"),
+        fields: Optional[str] = Query(None, description="Comma-separated booking fields to return, e.g. id,start_time,status"),
         skip: int = Query(0, ge=0),
         limit: int = Query(100, le=100),
         current_user: User = Depends(get_current_user),
@@ -64,34 +78,37 @@ def get_bookings(
         )
 
 
-    is_admin = UserCRUD.is_admin(current_user)
-
-    if is_admin:
-
-        query_params = BookingQuery(
-            status=status_filter,
-            from_date=parsed_from_date,
-            to_date=parsed_to_date
+    try:
+        field_set = parse_fields(fields, BookingResponse)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-        bookings = BookingCRUD.get_all_bookings(db, query_params, skip, limit)
-    else:
-
-        bookings = BookingCRUD.get_user_bookings(db, current_user.id, skip, limit)
 
+    try:
+        # BookingQuery's date fields are aliased to the query parameter names
+        query_params = BookingQuery(**{"status": status_filter, "from": parsed_from_date, "to": parsed_to_date})
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="; ".join(error["msg"] for error in e.errors())
+        )
 
-        if status_filter:
-            bookings = [b for b in bookings if b.status == status_filter]
-        if parsed_from_date:
-            bookings = [b for b in bookings if b.start_time >= parsed_from_date]
-        if parsed_to_date:
-            bookings = [b for b in bookings if b.end_time <= parsed_to_date]
+    # filters run in SQL for both, so the selected columns can be narrowed to `fields`
+    is_admin = UserCRUD.is_admin(current_user)
+    bookings = BookingCRUD.get_all_bookings(db, query_params, skip, limit,
+                                            user_id=None if is_admin else current_user.id, fields=field_set)
 
-    return bookings
+    etag = make_etag(sorted(field_set or ()), [(booking["id"], booking["updated_at"]) for booking in bookings])
+    item_model = sparse_model(BookingResponse, field_set) if field_set else BookingResponse
+    return conditional_response(request, List[item_model], bookings, etag)
 
 
 @booking_router.get("/{booking_id}", response_model=BookingResponse, status_code=status.HTTP_200_OK)
 def get_booking_by_id(
         booking_id: UUID,
+        request: Request,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -112,7 +129,8 @@ def get_booking_by_id(
             detail="Not authorized to view this booking"
         )
 
-    return booking
+    return conditional_response(request, BookingResponse, booking, make_etag(booking.id, booking.updated_at),
+                                last_modified=booking.updated_at)
 
 
 @booking_router.patch("/{booking_id}", response_model=BookingResponse, status_code=status.HTTP_200_OK)
@@ -1,49 +1,60 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
 
 from core.database import get_db
+from core.ratelimit import rate_limit
+from core.conditional import conditional_response, make_etag
+from core.fields import parse_fields, sparse_model
+from core.idempotency import idempotency_store
 from core.security import get_current_user, require_admin
+from core.serialization import json_response
 from crud.review import ReviewCRUD
 from crud.user import UserCRUD
 from models.user import User
-from schema.review import ReviewCreate, ReviewUpdate, ReviewResponse
+from schema.review import ReviewCreate, ReviewUpdate, ReviewResponse, ReviewStats, ReviewDetailResponse, ReviewInclude, \
+    INCLUDE_FIELDS
 
 review_router = APIRouter(tags=["reviews"], prefix="/reviews")
 
 
-@review_router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
+@review_router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED,
+                    dependencies=[Depends(rate_limit("review_write"))])
 def create_review(
         review_in: ReviewCreate,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
 
-    try:
-        review = ReviewCRUD.create_review(db, review_in, current_user.id)
-        return review
-    except ValueError as e:
-        if "not found" in str(e).lower():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=str(e)
-            )
-        elif "already exists" in str(e):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=str(e)
-            )
-        elif "not authorized" in str(e).lower() or "only review your own" in str(e):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=str(e)
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e)
-            )
+    def create(commit: bool = True):
+        try:
+            review = ReviewCRUD.create_review(db, review_in, current_user.id, commit)
+            return json_response(ReviewResponse, review, status.HTTP_201_CREATED)
+        except ValueError as e:
+            if "not found" in str(e).lower():
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=str(e)
+                )
+            elif "already exists" in str(e):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=str(e)
+                )
+            elif "not authorized" in str(e).lower() or "only review your own" in str(e):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=str(e)
+                )
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+
+    return idempotency_store.run(db, current_user.id, "POST /reviews", idempotency_key, review_in, create)
 
 
 @review_router.get("/{review_id}", response_model=ReviewResponse, status_code=status.HTTP_200_OK)
@@ -136,24 +147,48 @@ def delete_review(
 
 
 
-@review_router.get("/services/{service_id}/reviews", response_model=List[ReviewResponse],
-                   status_code=status.HTTP_200_OK)
+@review_router.get("/services/{service_id}/reviews", response_model=List[ReviewDetailResponse],
+                   response_model_exclude_none=True, status_code=status.HTTP_200_OK)
 def get_service_reviews(
         service_id: UUID,
+        include: Optional[str] = Query(None, description="Comma-separated related data to embed: reviewer, booking, service"),
+        fields: Optional[str] = Query(None, description="Comma-separated review fields to return, e.g. id,rating"),
         skip: int = Query(0, ge=0),
         limit: int = Query(100, le=100),
         db: Session = Depends(get_db)
 ):
 
-    reviews = ReviewCRUD.get_service_reviews(db, service_id, skip, limit)
-    return reviews
+    try:
+        include_set = {ReviewInclude(item.strip()) for item in include.split(",") if item.strip()} if include else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid include value. Allowed: {', '.join(item.value for item in ReviewInclude)}"
+        )
+
+    # related fields can only be asked for when their relation is included
+    allowed = frozenset(ReviewResponse.model_fields).union(
+        *(INCLUDE_FIELDS[item] for item in include_set or ())
+    )
+    try:
+        field_set = parse_fields(fields, sparse_model(ReviewDetailResponse, allowed))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    reviews = ReviewCRUD.get_service_reviews(db, service_id, skip, limit, include_set, fields=field_set)
+    item_model = sparse_model(ReviewDetailResponse, field_set) if field_set else ReviewDetailResponse
+    return json_response(List[item_model], reviews, exclude_none=True)
 
 
-@review_router.get("/services/{service_id}/stats", status_code=status.HTTP_200_OK)
+@review_router.get("/services/{service_id}/stats", response_model=ReviewStats, status_code=status.HTTP_200_OK)
 def get_service_review_stats(
         service_id: UUID,
+        request: Request,
         db: Session = Depends(get_db)
 ):
 
     stats = ReviewCRUD.get_service_review_stats(db, service_id)
-    return stats
\ No newline at end of file
+    return conditional_response(request, ReviewStats, stats, make_etag(service_id, stats))
\ No newline at end of file
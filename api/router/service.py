@@ -1,13 +1,19 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
 
 from core.database import get_db
+from core.conditional import conditional_response, make_etag
+from core.fields import parse_fields, sparse_model
 from core.security import get_current_user, require_admin
+from crud.leaderboard import service_leaderboard
+from crud.review import ReviewCRUD
 from crud.service import ServiceCRUD
 from models.user import User
-from schema.service import ServiceCreate, ServiceUpdate, ServiceQuery, ServiceResponse
+from schema.review import ServiceReviewStats
+from schema.service import ServiceCreate, ServiceUpdate, ServiceQuery, ServiceResponse, TopServiceResponse, \
+    ServiceFacet, ServiceSearchResponse, service_search_response
 
 service_router = APIRouter(tags=["service"], prefix="/services")
 
@@ -26,41 +32,81 @@ def create_service(
             detail=str(e)
         )
 
-@service_router.get("/", response_model=List[ServiceResponse], status_code=status.HTTP_200_OK)
+@service_router.get("/", response_model=Union[List[ServiceResponse], ServiceSearchResponse], status_code=status.HTTP_200_OK)
 def get_services(
+        request: Request,
         q: Optional[str] = Query(None, description="Search query"),
         price_min: Optional[float] = Query(None, description="Minimum price"),
         price_max: Optional[float] = Query(None, description="Maximum price"),
         active: Optional[bool] = Query(True, description="Filter by active status"),
+        facets: Optional[str] = Query(None, description="Comma-separated facets to count: price, duration"),
+        facet_buckets: int = Query(5, ge=1, le=20, description="Number of buckets per facet"),
+        fields: Optional[str] = Query(None, description="Comma-separated service fields to return, e.g. id,title,price"),
         skip: int = Query(0, ge=0),
         limit: int = Query(100, le=100),
         db: Session = Depends(get_db)
 ):
     query_params = ServiceQuery(q=q, price_min=price_min, price_max=price_max, active=active)
-    services = ServiceCRUD.search(db, query_params=query_params, skip=skip, limit=limit)
-
-    return [
-        {
-            "id": str(service.id),
-            "title": service.title,
-            "description": service.description,
-            "price": float(service.price),
-            "duration_minutes": service.duration_minutes,
-            "is_active": service.is_active,
-            "created_at": str(service.created_at)
-        }
-        for service in services
-    ]
+
+    try:
+        field_set = parse_fields(fields, ServiceResponse)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    item_model = sparse_model(ServiceResponse, field_set) if field_set else ServiceResponse
+
+    if facets:
+        try:
+            facet_set = {ServiceFacet(item.strip()) for item in facets.split(",") if item.strip()}
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid facet. Allowed: {', '.join(item.value for item in ServiceFacet)}"
+            )
+        result = ServiceCRUD.search(db, query_params=query_params, skip=skip, limit=limit,
+                                    facets=facet_set, facet_buckets=facet_buckets, fields=field_set)
+        etag = make_etag(sorted(field_set or ()), result["total"], result["facets"],
+                         [(item["id"], item["updated_at"]) for item in result["items"]])
+        response_type = service_search_response(item_model) if field_set else ServiceSearchResponse
+        return conditional_response(request, response_type, result, etag)
+
+    services = ServiceCRUD.search(db, query_params=query_params, skip=skip, limit=limit, fields=field_set)
+    etag = make_etag(sorted(field_set or ()), [(service["id"], service["updated_at"]) for service in services])
+    return conditional_response(request, List[item_model], services, etag)
+
+@service_router.get("/top", response_model=List[TopServiceResponse], status_code=status.HTTP_200_OK)
+def get_top_services(
+        limit: int = Query(10, ge=1, le=100),
+        db: Session = Depends(get_db)
+):
+
+    return service_leaderboard.top(db, limit)
+
+
+@service_router.get("/stats", response_model=List[ServiceReviewStats], status_code=status.HTTP_200_OK)
+def get_services_review_stats(
+        ids: List[UUID] = Query(..., max_length=100, description="Service IDs to fetch review stats for"),
+        db: Session = Depends(get_db)
+):
+
+    service_ids = list(dict.fromkeys(ids))
+    stats = ReviewCRUD.get_services_review_stats(db, service_ids)
+
+    return [{"service_id": service_id, **stats[service_id]} for service_id in service_ids]
+
 
 @service_router.get("/{service_id}", response_model=ServiceResponse, status_code=status.HTTP_200_OK)
-def get_service_by_id(service_id:UUID, db: Session= Depends(get_db)):
+def get_service_by_id(service_id:UUID, request: Request, db: Session= Depends(get_db)):
     service = ServiceCRUD.get_service_by_id(db, service_id)
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Service not found"
         )
-    return service
+    return conditional_response(request, ServiceResponse, service, make_etag(service.id, service.updated_at),
+                                last_modified=service.updated_at)
 
 
 @service_router.patch("/{service_id}",response_model=ServiceResponse, status_code=status.HTTP_200_OK )
@@ -93,5 +139,11 @@ def delete_service(
         db: Session = Depends(get_db)
 ):
 
-    ServiceCRUD.remove(db, service_id)
+    try:
+        ServiceCRUD.soft_delete(db, service_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     return None
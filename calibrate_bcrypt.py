@@ -0,0 +1,47 @@
+"""Pick a bcrypt cost factor for this host.
+
+Hashes a sample password at increasing rounds and reports the highest cost whose
+median hash time stays within the target. Set the result as BCRYPT_ROUNDS; existing
+users are rehashed transparently on their next login.
+
+    python calibrate_bcrypt.py --target-ms 100
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def measure(rounds: int, samples: int) -> float:
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def calibrate(target_ms: float, samples: int) -> int:
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed_ms = measure(rounds, samples)
+        print(f"rounds={rounds:<3} {elapsed_ms:8.1f} ms")
+        if elapsed_ms > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure bcrypt cost on this host")
+    parser.add_argument("--target-ms", type=float, default=100, help="Hash time budget in milliseconds")
+    parser.add_argument("--samples", type=int, default=5, help="Hashes measured per cost factor")
+    args = parser.parse_args()
+
+    rounds = calibrate(args.target_ms, args.samples)
+    print(f"\nBCRYPT_ROUNDS={rounds}")
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.metrics import metrics
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "True") == "True"
+READ_METHODS = ("GET", "HEAD")
+# never queued: health checks and metrics must answer while everything else is saturated, and
+# /batch only fans out to sub-requests that are admitted individually (holding a slot would deadlock)
+EXEMPT_PATHS = ("/", "/metrics", "/batch", "/docs", "/redoc", "/openapi.json")
+
+
+class AdmissionGroup:
+    """Concurrency limit with a bounded FIFO wait queue for one group of routes.
+
+    Runs on the event loop only, so no locking. A request over the limit waits for a
+    released slot for at most `max_wait` seconds; when the queue is full, or the wait
+    runs out, it is rejected at once instead of tying up a worker thread.
+    """
+
+    def __init__(self, name: str, spec: str, methods: Optional[Tuple[str, ...]] = None,
+                 prefixes: Optional[Tuple[str, ...]] = None):
+        # spec is "<concurrent>/<queued>/<max wait seconds>", e.g. "8/32/2"
+        limit, max_queue, max_wait = spec.split("/")
+        self.name = name
+        self.limit = int(limit)
+        self.max_queue = int(max_queue)
+        self.max_wait = float(max_wait)
+        self.methods = methods
+        self.prefixes = prefixes
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        metrics.gauge(f"admission_active:{name}", lambda: self.active)
+        metrics.gauge(f"admission_queued:{name}", lambda: len(self._waiters))
+        self._queue_seconds = metrics.summary(f"admission_queue_seconds:{name}")
+        self._rejected = metrics.counter(f"admission_rejected_total:{name}")
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        return self.prefixes is None or any(path.startswith(prefix) for prefix in self.prefixes)
+
+    async def acquire(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._queue_seconds.observe(0.0)
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self._rejected.inc()
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            # release() may have handed the slot over just as the deadline passed
+            if not (waiter.done() and not waiter.cancelled()):
+                self._remove(waiter)
+                self._rejected.inc()
+                return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._remove(waiter)
+            raise
+
+        self._queue_seconds.observe(time.monotonic() - started)
+        return True
+
+    def _remove(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self):
+        # the slot passes straight to the oldest waiter, so `active` only drops when nobody waits
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+def _group(name: str, default: str, **kwargs) -> AdmissionGroup:
+    return AdmissionGroup(name, os.getenv(f"ADMISSION_{name.upper()}", default), **kwargs)
+
+
+# first match wins. The defaults add up to 28 concurrent requests, inside the default
+# DB pool (DB_POOL_SIZE + DB_MAX_OVERFLOW = 30), so a write storm queues here rather
+# than on the pool and cannot take the slots reads need
+GROUPS: List[AdmissionGroup] = [
+    # login/register spend most of their time in bcrypt on the hashing executor
+    _group("auth", "4/16/2", prefixes=("/auth",)),
+    _group("booking_write", "4/16/2", prefixes=("/bookings",), methods=("POST", "PATCH", "PUT", "DELETE")),
+    _group("write", "4/16/2", methods=("POST", "PATCH", "PUT", "DELETE")),
+    _group("read", "16/64/1", methods=READ_METHODS),
+]
+
+
+class AdmissionControlMiddleware:
+    """Admits each request through the first matching AdmissionGroup, or answers 503 with Retry-After"""
+
+    def __init__(self, app: ASGIApp, groups: Optional[List[AdmissionGroup]] = None, enabled: bool = ADMISSION_ENABLED):
+        self.app = app
+        self.groups = GROUPS if groups is None else groups
+        self.enabled = enabled
+
+    def match(self, method: str, path: str) -> Optional[AdmissionGroup]:
+        return next((group for group in self.groups if group.matches(method, path)), None)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.enabled or (scope["path"].rstrip("/") or "/") in EXEMPT_PATHS:
+            return await self.app(scope, receive, send)
+
+        group = self.match(scope["method"], scope["path"])
+        if group is None:
+            return await self.app(scope, receive, send)
+
+        if not await group.acquire():
+            body = json.dumps({"detail": "Server is busy, please retry shortly"}).encode()
+            await send({"type": "http.response.start", "status": 503, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", b"1"),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Scope
+
+from core.metrics import metrics
+from core.ratelimit import RateLimiter
+
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", 20))
+# reads in flight at once per batch; each one checks out its own pool connection
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 4))
+BATCH_PATH = "/batch"
+
+READ_METHODS = ("GET",)
+# forwarded from the batch request unless a sub-request sets its own
+INHERITED_HEADERS = (b"authorization", b"user-agent", b"accept-language")
+# the client address travels in the sub-request's `client` instead, resolved once from the batch request
+STRIPPED_HEADERS = (b"x-forwarded-for",)
+# describe the sub-response's own bytes, which are decoded into the batch body
+DROPPED_RESPONSE_HEADERS = ("content-length", "content-encoding", "vary")
+
+_sub_requests = metrics.counter("batch_sub_requests_total")
+_batch_size = metrics.summary("batch_size")
+
+
+def _sub_scope(parent: Scope, method: str, path: str, headers: Dict[str, str], body: bytes) -> Scope:
+    path, _, query = path.partition("?")
+    own = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()
+           if name.lower().encode("latin-1") not in STRIPPED_HEADERS]
+    own_names = {name for name, _ in own}
+    raw_headers = [(name, value) for name, value in parent["headers"]
+                   if name in INHERITED_HEADERS and name not in own_names] + own
+    if body:
+        if b"content-type" not in own_names:
+            raw_headers.append((b"content-type", b"application/json"))
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+
+    return {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": method,
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        # what the rate limiter keys anonymous callers on, so sub-requests share the batch caller's buckets
+        "client": (RateLimiter.client_ip(Request(parent)), parent["client"][1] if parent.get("client") else 0),
+        "root_path": parent.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "query_string": query.encode("latin-1"),
+        "headers": raw_headers,
+        "state": dict(parent.get("state", {})),
+    }
+
+
+async def dispatch(app: ASGIApp, parent: Scope, method: str, path: str,
+                   headers: Optional[Dict[str, str]] = None, body: Any = None) -> Tuple[int, Dict[str, str], Any]:
+    """Run one sub-request through the full ASGI app (middleware, rate limits, caches) in-process"""
+    if path.partition("?")[0].rstrip("/") == BATCH_PATH:
+        return 400, {}, {"detail": "Nested batch requests are not allowed"}
+
+    payload = b"" if body is None else json.dumps(body, separators=(",", ":")).encode()
+    scope = _sub_scope(parent, method, path, headers or {}, payload)
+    start: Message = {}
+    chunks: List[bytes] = []
+    finished = asyncio.Event()
+    body_sent = False
+
+    async def receive() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        # only streaming responses listen for a disconnect; it comes once they are done
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    _sub_requests.inc()
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # ServerErrorMiddleware re-raises after sending its 500; keep the rest of the batch going
+        if not start:
+            return 500, {}, {"detail": "Internal Server Error"}
+    finally:
+        finished.set()
+
+    response_headers = {
+        name.decode("latin-1"): value.decode("latin-1") for name, value in start.get("headers", [])
+        if name.decode("latin-1") not in DROPPED_RESPONSE_HEADERS
+    }
+    raw = b"".join(chunks)
+    content: Any = None
+    if raw:
+        if response_headers.get("content-type", "").startswith("application/json"):
+            content = json.loads(raw)
+        else:
+            content = raw.decode("utf-8", errors="replace")
+    return start["status"], response_headers, content
+
+
+async def run_batch(app: ASGIApp, parent: Scope, items: List[Dict[str, Any]]) -> List[Tuple[int, Dict[str, str], Any]]:
+    """Results in request order. Runs of consecutive reads go out concurrently; each write
+    waits for everything before it and finishes before anything after it starts, so a
+    client can create a booking and read it back in the same batch."""
+    _batch_size.observe(len(items))
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+    results: List[Optional[Tuple[int, Dict[str, str], Any]]] = [None] * len(items)
+
+    async def run(index: int):
+        async with semaphore:
+            item = items[index]
+            results[index] = await dispatch(app, parent, item["method"], item["path"], item.get("headers"), item.get("body"))
+
+    reads: List[int] = []
+    for index, item in enumerate(items):
+        if item["method"] in READ_METHODS:
+            reads.append(index)
+            continue
+        await asyncio.gather(*(run(i) for i in reads))
+        reads = []
+        await run(index)
+    await asyncio.gather(*(run(i) for i in reads))
+    return results
@@ -0,0 +1,126 @@
+import gzip
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True") == "True"
+# below this many bytes the headers and CPU cost more than the saved bandwidth
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+COMPRESSION_CONTENT_TYPES = [
+    item.strip() for item in os.getenv("COMPRESSION_CONTENT_TYPES", "application/json,text/").split(",") if item.strip()
+]
+
+# in order of preference when the client accepts several
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+if zstandard is not None:
+    ENCODERS["zstd"] = lambda body: zstandard.compress(body, COMPRESSION_ZSTD_LEVEL)
+ENCODERS["gzip"] = lambda body: gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Available encoding with the highest q (> 0), or None for identity; ENCODERS order breaks ties"""
+    if not COMPRESSION_ENABLED or not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    # an explicitly preferred identity beats every encoding it outranks
+    best, best_quality = None, accepted.get("identity", 0.0)
+    for name in ENCODERS:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def is_compressible(headers: Headers, body_size: int) -> bool:
+    if "content-encoding" in headers or body_size < COMPRESSION_MIN_SIZE:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip()
+    return any(content_type.startswith(allowed) for allowed in COMPRESSION_CONTENT_TYPES)
+
+
+def precompress(raw_headers: List[Tuple[bytes, bytes]], body: bytes) -> Dict[str, bytes]:
+    """Every available encoding of `body`, for responses that are stored and replayed many times"""
+    if not COMPRESSION_ENABLED or not is_compressible(Headers(raw=raw_headers), len(body)):
+        return {}
+    return {name: encode(body) for name, encode in ENCODERS.items()}
+
+
+def encoded_headers(raw_headers: List[Tuple[bytes, bytes]], encoding: str, length: int) -> List[Tuple[bytes, bytes]]:
+    headers = MutableHeaders(raw=list(raw_headers))
+    headers["Content-Encoding"] = encoding
+    headers["Content-Length"] = str(length)
+    headers.add_vary_header("Accept-Encoding")
+    return headers.raw
+
+
+class CompressionMiddleware:
+    """Compresses single-chunk responses of allowed content types above COMPRESSION_MIN_SIZE.
+
+    Responses that already carry Content-Encoding (e.g. precompressed cache hits) and
+    streamed responses are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        pending_start: Optional[Message] = None
+
+        async def compressing_send(message: Message):
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                # held back until the first body chunk shows whether it is worth compressing
+                pending_start = message
+                return
+
+            if message["type"] != "http.response.body" or pending_start is None:
+                return await send(message)
+
+            start, pending_start = pending_start, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not is_compressible(Headers(raw=start["headers"]), len(body)):
+                await send(start)
+                return await send(message)
+
+            compressed = ENCODERS[encoding](body)
+            await send({**start, "headers": encoded_headers(start["headers"], encoding, len(compressed))})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
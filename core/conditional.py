@@ -0,0 +1,62 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+from core.serialization import json_response
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over whatever identifies a representation (ids and row versions, stats values, ...)"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    # weak: the same content may go out with different encodings (e.g. compressed)
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored on both sides
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified_since(request: Request, last_modified: Optional[datetime]) -> bool:
+    if_modified_since = request.headers.get("if-modified-since")
+    # If-Modified-Since is ignored when If-None-Match is present (RFC 9110 13.1.3)
+    if last_modified is None or not if_modified_since or "if-none-match" in request.headers:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_response(request: Request, response_type: Any, content: Any, etag: str,
+                         last_modified: Optional[datetime] = None, exclude_none: bool = False) -> Response:
+    """304 when the client's copy is current, otherwise `json_response` with ETag/Last-Modified.
+
+    The validators are computed from data the route already has, so a matching
+    request returns before any validation or JSON encoding.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if etag_matches(request, etag) or _not_modified_since(request, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response = json_response(response_type, content, exclude_none=exclude_none)
+    response.headers.update(headers)
+    return response
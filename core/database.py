@@ -1,8 +1,12 @@
 import os
+import threading
+from typing import Iterable, List, Optional, Tuple
+
 from dotenv import load_dotenv
+from fastapi import Request
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 import logging
 
 load_dotenv()
@@ -27,8 +31,92 @@ SessionLocal = sessionmaker(autocommit = False, autoflush= False, bind= engine)
 
 Base = declarative_base()
 
-def get_db():
+
+class TimeoutPolicy:
+    def __init__(self, name: str, spec: str, methods: Optional[Tuple[str, ...]] = None,
+                 prefixes: Optional[Tuple[str, ...]] = None):
+        # spec is "<statement_timeout ms>/<lock_timeout ms>", e.g. "2000/1000"; 0 disables either
+        statement_ms, lock_ms = spec.split("/")
+        self.name = name
+        self.statement_ms = int(statement_ms)
+        self.lock_ms = int(lock_ms)
+        self.methods = methods
+        self.prefixes = prefixes
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        return self.prefixes is None or any(path.startswith(prefix) for prefix in self.prefixes)
+
+
+def _timeouts(name: str, default: str, **kwargs) -> TimeoutPolicy:
+    return TimeoutPolicy(name, os.getenv(f"DB_TIMEOUT_{name.upper()}", default), **kwargs)
+
+
+# first match wins
+DB_TIMEOUTS: List[TimeoutPolicy] = [
+    # free-text search and facet counts over the whole catalogue
+    _timeouts("search", "2000/1000", methods=("GET",), prefixes=("/services",)),
+    # admin listings can ask for arbitrary date ranges
+    _timeouts("listing", "5000/1000", methods=("GET",), prefixes=("/bookings", "/reviews", "/users")),
+    _timeouts("write", "5000/2000", methods=("POST", "PATCH", "PUT", "DELETE")),
+    _timeouts("default", "5000/2000"),
+]
+
+
+def timeout_policy(method: str, path: str) -> TimeoutPolicy:
+    return next(policy for policy in DB_TIMEOUTS if policy.matches(method, path))
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _apply_timeouts(session, transaction, connection):
+    policy = session.info.get("timeout_policy")
+    if policy is None or connection.dialect.name != "postgresql":
+        return
+    with session.info["cancel_lock"]:
+        session.info["dbapi_connection"] = connection.connection.driver_connection
+    # is_local=true is SET LOCAL: it ends with the transaction, so pooled connections come back clean
+    connection.execute(
+        text("SELECT set_config('statement_timeout', :statement, true), set_config('lock_timeout', :lock, true)"),
+        {"statement": f"{policy.statement_ms}ms", "lock": f"{policy.lock_ms}ms"},
+    )
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_connection(session):
+    # fires before the connection goes back to the pool, where a cancel could hit another request's query
+    lock = session.info.get("cancel_lock")
+    if lock is not None:
+        with lock:
+            session.info.pop("dbapi_connection", None)
+
+
+def cancel_queries(sessions: Iterable[Session]) -> int:
+    """Cancel whatever statement each session is running; safe to call from any thread"""
+    cancelled = 0
+    for session in list(sessions):
+        lock = session.info.get("cancel_lock")
+        if lock is None:
+            continue
+        with lock:
+            dbapi_connection = session.info.get("dbapi_connection")
+            if dbapi_connection is not None:
+                dbapi_connection.cancel()
+                cancelled += 1
+    return cancelled
+
+
+def get_db(request: Request):
     db = SessionLocal()
+    policy = timeout_policy(request.method, request.url.path)
+    db.info["timeout_policy"] = policy
+    db.info["cancel_lock"] = threading.Lock()
+    request.state.db_timeout_group = policy.name
+    # set by QueryCancellationMiddleware, which cancels these sessions' statements if the client disconnects
+    sessions = request.scope.get("db_sessions")
+    if sessions is not None:
+        sessions.append(db)
     try:
         yield db
     except Exception as e:
@@ -36,6 +124,8 @@ def get_db():
         db.rollback()
         raise
     finally:
+        if sessions is not None:
+            sessions.remove(db)
         db.close()
 
 def create_tables():
@@ -0,0 +1,36 @@
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional, Sequence, Type
+
+from pydantic import BaseModel, ConfigDict, create_model
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """Comma-separated `fields=` value checked against the response schema; None means all fields"""
+    if not fields:
+        return None
+
+    requested = frozenset(item.strip() for item in fields.split(",") if item.strip())
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise ValueError(
+            f"Invalid field(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(model.model_fields)}"
+        )
+    return requested or None
+
+
+@lru_cache(maxsize=None)
+def sparse_model(model: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """`model` cut down to `fields`, with the same types and constraints"""
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (info.annotation, info) for name, info in model.model_fields.items() if name in fields},
+    )
+
+
+def narrow_columns(columns: Sequence, fields: Optional[Iterable[str]], always: Iterable[str] = ("id",)) -> list:
+    """The subset of `columns` a sparse fieldset needs; `always` keeps keys used for ETags and filtering"""
+    if fields is None:
+        return list(columns)
+    keep = set(fields) | set(always)
+    return [column for column in columns if column.key in keep]
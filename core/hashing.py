@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from core.metrics import metrics
+
+# "thread" is enough while bcrypt releases the GIL; "process" spreads hashing over all cores
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+# hashes allowed to wait for a worker before new ones are rejected with 503
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 16))
+
+
+class HashingBusyError(Exception):
+    """All hashing workers are busy and the wait queue is full"""
+
+
+def _timed(fn: Callable, *args):
+    # runs inside the worker, so the measured time excludes queueing
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class HashingExecutor:
+    """Dedicated, bounded pool for bcrypt work.
+
+    Password hashing never runs on more than `workers` threads/processes, at most
+    `queue_size` more calls wait, and anything beyond that fails fast with
+    HashingBusyError instead of tying up the request threadpool.
+    """
+
+    def __init__(self, kind: str = PASSWORD_HASH_EXECUTOR, workers: int = PASSWORD_HASH_WORKERS,
+                 queue_size: int = PASSWORD_HASH_QUEUE_SIZE):
+        self.kind = kind
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+
+        self._in_flight = metrics.gauge("password_hash_in_flight")
+        self._rejected = metrics.counter("password_hash_rejected_total")
+        self._hash_seconds = metrics.summary("password_hash_seconds")
+        self._wait_seconds = metrics.summary("password_hash_queue_wait_seconds")
+
+    def _get_executor(self) -> Executor:
+        # created lazily so importing this module never forks worker processes
+        with self._executor_lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    def run(self, fn: Callable, *args):
+        if not self._slots.acquire(blocking=False):
+            self._rejected.inc()
+            raise HashingBusyError("Password hashing is saturated")
+
+        self._in_flight.inc()
+        submitted = time.perf_counter()
+        try:
+            result, elapsed = self._get_executor().submit(_timed, fn, *args).result()
+            self._hash_seconds.observe(elapsed)
+            self._wait_seconds.observe(max(time.perf_counter() - submitted - elapsed, 0.0))
+            return result
+        finally:
+            self._in_flight.dec()
+            self._slots.release()
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hashing_executor = HashingExecutor()
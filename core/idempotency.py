@@ -0,0 +1,253 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from core.metrics import metrics
+from models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# how long a stored response is replayed; clients retry within minutes, not days
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 3600))
+# an unfinished reservation older than this is assumed to belong to a crashed request and may be taken over
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 60))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 10000))
+IDEMPOTENCY_PRUNE_SECONDS = int(os.getenv("IDEMPOTENCY_PRUNE_SECONDS", 3600))
+IDEMPOTENCY_MAX_KEY_LENGTH = 255
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+# recomputed when the stored body is replayed
+UNSTORED_HEADERS = ("content-length", "content-type")
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: Optional[int]  # None while the original request is in progress
+    body: Optional[bytes]
+    headers: Dict[str, str]
+    expires_at: float
+
+
+def request_hash(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Responses of keyed writes, replayed when a client retries with the same Idempotency-Key.
+
+    The idempotency_keys table is the source of truth and also serialises concurrent
+    retries: the first request inserts an unfinished row, anything arriving while it runs
+    gets 409, and the finished response (success or 4xx) is written back to the row. Each
+    process keeps finished responses in a small LRU so most replays skip the database.
+    Expired rows are pruned every IDEMPOTENCY_PRUNE_SECONDS.
+    """
+
+    def __init__(self, ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS, cache_size: int = IDEMPOTENCY_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[UUID, str, str], StoredResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._replays = metrics.counter("idempotency_replays_total")
+        self._conflicts = metrics.counter("idempotency_conflicts_total")
+        metrics.gauge("idempotency_cached_responses", lambda: len(self._cache))
+
+    def _cache_get(self, cache_key: Tuple[UUID, str, str]) -> Optional[StoredResponse]:
+        with self._lock:
+            stored = self._cache.get(cache_key)
+            if stored is None:
+                return None
+            if stored.expires_at <= time.time():
+                del self._cache[cache_key]
+                return None
+            self._cache.move_to_end(cache_key)
+            return stored
+
+    def _cache_set(self, cache_key: Tuple[UUID, str, str], stored: StoredResponse):
+        with self._lock:
+            self._cache[cache_key] = stored
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def lookup(self, db: Session, user_id: UUID, route: str, key: str) -> Optional[StoredResponse]:
+        stored = self._cache_get((user_id, route, key))
+        if stored is not None:
+            return stored
+
+        row = db.execute(
+            select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body,
+                   IdempotencyKey.response_headers, IdempotencyKey.expires_at)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.route == route, IdempotencyKey.key == key,
+                   IdempotencyKey.expires_at > datetime.now(timezone.utc))
+        ).first()
+        if row is None:
+            return None
+
+        stored = StoredResponse(row.request_hash, row.status_code, row.response_body, row.response_headers or {},
+                                row.expires_at.timestamp())
+        if stored.status_code is not None:
+            self._cache_set((user_id, route, key), stored)
+        return stored
+
+    def reserve(self, db: Session, user_id: UUID, route: str, key: str, body_hash: str) -> bool:
+        """Claim the key for this request; False when another request holds it or already finished"""
+        now = datetime.now(timezone.utc)
+        values = {
+            "request_hash": body_hash,
+            "status_code": None,
+            "response_body": None,
+            "response_headers": None,
+            "expires_at": now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS),
+        }
+        statement = pg_insert(IdempotencyKey).values(user_id=user_id, route=route, key=key, **values)
+        # expired rows and abandoned reservations are taken over instead of blocking the key
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.user_id, IdempotencyKey.route, IdempotencyKey.key],
+            set_=values,
+            where=IdempotencyKey.expires_at <= now,
+        ).returning(IdempotencyKey.key)
+        claimed = db.scalar(statement) is not None
+        db.commit()
+        return claimed
+
+    def complete(self, db: Session, user_id: UUID, route: str, key: str, body_hash: str, response: Response):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        headers = {name: value for name, value in response.headers.items() if name not in UNSTORED_HEADERS}
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.route == route, IdempotencyKey.key == key)
+            .values(status_code=response.status_code, response_body=response.body, response_headers=headers,
+                    expires_at=expires_at)
+        )
+        db.commit()
+        self._cache_set((user_id, route, key),
+                        StoredResponse(body_hash, response.status_code, response.body, headers, expires_at.timestamp()))
+
+    def release(self, db: Session, user_id: UUID, route: str, key: str):
+        """Forget an unfinished reservation so the client can retry after a server error"""
+        db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.route == route,
+                                         IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+        )
+        db.commit()
+
+    def _replay(self, stored: StoredResponse, body_hash: str) -> Response:
+        if stored.request_hash != body_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request body"
+            )
+        if stored.status_code is None:
+            self._conflicts.inc()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still being processed",
+                headers={"Retry-After": "1"}
+            )
+        self._replays.inc()
+        return Response(content=stored.body, status_code=stored.status_code, media_type="application/json",
+                        headers={**stored.headers, REPLAYED_HEADER: "true"})
+
+    def run(self, db: Session, user_id: UUID, route: str, key: Optional[str], payload: BaseModel,
+            operation: Callable[..., Response]) -> Response:
+        """Return the stored response for a known key, otherwise run `operation` once and store its result.
+
+        Client errors (HTTPException < 500) are stored and replayed like successes, so a retried
+        conflicting booking gets its 409 back without another conflict check. Server errors
+        release the key. On the keyed path `operation` is called with `commit=False` and the
+        stored response is written before the single commit, so the created row and its response
+        land together: a crash leaves neither behind and a retry can safely run the create again.
+        """
+        if key is None:
+            return operation()
+        if not key or len(key) > IDEMPOTENCY_MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Idempotency-Key must be 1-{IDEMPOTENCY_MAX_KEY_LENGTH} characters"
+            )
+
+        body_hash = request_hash(payload)
+        stored = self.lookup(db, user_id, route, key)
+        if stored is not None:
+            return self._replay(stored, body_hash)
+
+        if not self.reserve(db, user_id, route, key, body_hash):
+            # lost a race with a concurrent retry, which either finished or is still running
+            stored = self.lookup(db, user_id, route, key)
+            return self._replay(stored or StoredResponse(body_hash, None, None, {}, 0.0), body_hash)
+
+        try:
+            response = operation(commit=False)
+        except HTTPException as e:
+            db.rollback()
+            if e.status_code >= 500:
+                self.release(db, user_id, route, key)
+                raise
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=e.headers)
+        except Exception:
+            db.rollback()
+            self.release(db, user_id, route, key)
+            raise
+
+        try:
+            self.complete(db, user_id, route, key, body_hash, response)
+        except Exception:
+            db.rollback()
+            self.release(db, user_id, route, key)
+            raise
+        return response
+
+    def prune(self, db: Session):
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now(timezone.utc)))
+        db.commit()
+        now = time.time()
+        with self._lock:
+            for cache_key in [cache_key for cache_key, stored in self._cache.items() if stored.expires_at <= now]:
+                del self._cache[cache_key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _run(self):
+        while not self._stop.wait(IDEMPOTENCY_PRUNE_SECONDS):
+            db = SessionLocal()
+            try:
+                self.prune(db)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"idempotency key prune failed: {e}")
+            finally:
+                db.close()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="idempotency-prune", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,97 @@
+import threading
+from typing import Callable, Dict, Optional
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    def snapshot(self):
+        return self._value
+
+
+class Gauge:
+    """Point-in-time value; either set directly or read from a callback at snapshot time"""
+
+    def __init__(self, callback: Optional[Callable[[], float]] = None):
+        self._value = 0
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    def snapshot(self):
+        if self._callback is not None:
+            return self._callback()
+        return self._value
+
+
+class Summary:
+    """Count, sum and max of observed values (e.g. durations in seconds)"""
+
+    def __init__(self):
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "count": self._count,
+                "sum": round(self._sum, 6),
+                "avg": round(self._sum / self._count, 6) if self._count else 0.0,
+                "max": round(self._max, 6),
+            }
+
+
+class MetricsRegistry:
+    """Process-local metrics, exposed as JSON on GET /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def counter(self, name: str) -> Counter:
+        return self._get_or_create(name, Counter)
+
+    def gauge(self, name: str, callback: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(callback))
+
+    def summary(self, name: str) -> Summary:
+        return self._get_or_create(name, Summary)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
+
+
+metrics = MetricsRegistry()
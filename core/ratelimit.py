@@ -0,0 +1,139 @@
+import importlib
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from core.metrics import metrics
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True") == "True"
+# "package.module:ClassName" of a shared RateLimitBackend (e.g. Redis) for multi-worker deployments
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND")
+# only trust X-Forwarded-For behind a proxy that sets it (Render does); otherwise clients choose their own key
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "False") == "True"
+# proxies in front of the app that each append to X-Forwarded-For; the client is the hop the outermost one saw
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", 1))
+RATE_LIMIT_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", 100000))
+
+
+class RateLimitBackend(ABC):
+    """Token-bucket storage. Implementations must make `take` atomic per key."""
+
+    @abstractmethod
+    def take(self, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        """Take one token; returns (allowed, seconds until a token is available)"""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets; limits are per worker when running several"""
+
+    def __init__(self, max_buckets: int = RATE_LIMIT_MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+
+            if tokens >= 1:
+                allowed, retry_after = True, 0.0
+                tokens -= 1
+            else:
+                allowed, retry_after = False, (1 - tokens) / refill_per_second
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # least recently used buckets are the ones that have refilled anyway
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+        return allowed, retry_after
+
+
+class RateLimitPolicy:
+    def __init__(self, name: str, spec: str, key: str = "user"):
+        # spec is "<requests>/<seconds>", e.g. "10/60"; key is "user" (JWT subject, falling back to IP) or "ip"
+        requests, seconds = spec.split("/")
+        self.name = name
+        self.capacity = int(requests)
+        self.refill_per_second = int(requests) / float(seconds)
+        self.key = key
+
+
+POLICIES: Dict[str, RateLimitPolicy] = {
+    # bcrypt-heavy and anonymous, so keyed by client IP
+    "auth": RateLimitPolicy("auth", os.getenv("RATE_LIMIT_AUTH", "10/60"), key="ip"),
+    # conflict check + insert per call
+    "booking_write": RateLimitPolicy("booking_write", os.getenv("RATE_LIMIT_BOOKING_WRITE", "30/60")),
+    "review_write": RateLimitPolicy("review_write", os.getenv("RATE_LIMIT_REVIEW_WRITE", "30/60")),
+}
+
+
+def _load_backend() -> RateLimitBackend:
+    if not RATE_LIMIT_BACKEND:
+        return InMemoryRateLimitBackend()
+    module_name, class_name = RATE_LIMIT_BACKEND.split(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, enabled: bool = RATE_LIMIT_ENABLED):
+        self.backend = backend
+        self.enabled = enabled
+
+    @staticmethod
+    def client_ip(request: Request) -> str:
+        forwarded = request.headers.get("x-forwarded-for")
+        if RATE_LIMIT_TRUST_FORWARDED and forwarded:
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+            # entries left of the ones our proxies appended were written by the client and prove nothing
+            if len(hops) >= RATE_LIMIT_TRUSTED_PROXIES > 0:
+                return hops[-RATE_LIMIT_TRUSTED_PROXIES]
+        return request.client.host if request.client else "unknown"
+
+    @staticmethod
+    def client_key(request: Request, policy: RateLimitPolicy) -> str:
+        if policy.key == "user":
+            from core.security import verify_token
+
+            authorization = request.headers.get("authorization", "")
+            if authorization.lower().startswith("bearer "):
+                payload = verify_token(authorization[7:], token_type="access")
+                if payload and payload.get("sub"):
+                    return f"user:{payload['sub']}"
+        return f"ip:{RateLimiter.client_ip(request)}"
+
+    def check(self, request: Request, policy: RateLimitPolicy):
+        if not self.enabled:
+            return
+
+        key = f"{policy.name}:{RateLimiter.client_key(request, policy)}"
+        allowed, retry_after = self.backend.take(key, policy.capacity, policy.refill_per_second)
+        if not allowed:
+            metrics.counter(f"rate_limit_throttled_total:{policy.name}").inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+
+
+rate_limiter = RateLimiter(_load_backend())
+
+
+def rate_limit(policy_name: str):
+    """Route dependency: `dependencies=[Depends(rate_limit("auth"))]`"""
+    policy = POLICIES[policy_name]
+
+    def dependency(request: Request):
+        rate_limiter.check(request, policy)
+
+    return dependency
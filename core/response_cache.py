@@ -0,0 +1,259 @@
+import asyncio
+import importlib
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.compression import encoded_headers, negotiate, precompress
+from core.conditional import etag_matches
+from core.metrics import metrics
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "True") == "True"
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+# "package.module:ClassName" of a shared ResponseCacheBackend (e.g. Redis) for multi-worker deployments
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND")
+RESPONSE_CACHE_SERVICES_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_SERVICES_TTL_SECONDS", 60))
+RESPONSE_CACHE_REVIEWS_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_REVIEWS_TTL_SECONDS", 30))
+
+UUID_PATTERN = "[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+# conditional headers are answered from the cached entry, never forwarded on a miss
+CONDITIONAL_HEADERS = (b"if-none-match", b"if-modified-since")
+
+
+class CachedResponse:
+    __slots__ = ("status", "headers", "body", "variants", "etag", "tag", "expires_at")
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, tag: str, ttl_seconds: int):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        # compressed once when stored, so hits never recompress
+        self.variants = precompress(headers, body)
+        self.etag = next((value.decode("latin-1") for name, value in headers if name == b"etag"), None)
+        self.tag = tag
+        self.expires_at = time.monotonic() + ttl_seconds
+
+    @property
+    def size(self) -> int:
+        return (len(self.body) + sum(len(variant) for variant in self.variants.values())
+                + sum(len(name) + len(value) for name, value in self.headers))
+
+
+class ResponseCacheBackend(ABC):
+    """Storage for cached responses. `invalidate` drops every entry stored under a tag."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, response: CachedResponse):
+        ...
+
+    @abstractmethod
+    def invalidate(self, tag: str):
+        ...
+
+
+class InMemoryResponseCacheBackend(ResponseCacheBackend):
+    """Per-process LRU bounded by total body + header bytes"""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        metrics.gauge("response_cache_bytes", lambda: self._size)
+
+    def _remove(self, key: str):
+        self._size -= self._entries.pop(key).size
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                return None
+            if response.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: CachedResponse):
+        # one huge listing should not flush everything else
+        if response.size > self.max_bytes // 8:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = response
+            self._size += response.size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tag: str):
+        with self._lock:
+            for key in [key for key, response in self._entries.items() if response.tag == tag]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class CacheRule:
+    def __init__(self, path: str, ttl_seconds: int, tag: str):
+        # "{name}" segments match a UUID path parameter, so /services/{id} does not catch /services/top
+        self.pattern = re.compile("^" + re.sub(r"\\\{\w+\\\}", UUID_PATTERN, re.escape(path)) + "$")
+        self.ttl_seconds = ttl_seconds
+        self.tag = tag
+
+
+def _load_backend() -> ResponseCacheBackend:
+    if not RESPONSE_CACHE_BACKEND:
+        return InMemoryResponseCacheBackend()
+    module_name, class_name = RESPONSE_CACHE_BACKEND.split(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class ResponseCache:
+    """Shared-response cache for public GET routes, filled by ResponseCacheMiddleware.
+
+    Entries are tagged by what they depend on ("services", "reviews") and CRUD writes
+    call `invalidate(tag)`. With the in-memory backend that only reaches this worker;
+    other workers catch up when their entries expire, or use a shared backend.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend, enabled: bool = RESPONSE_CACHE_ENABLED):
+        self.backend = backend
+        self.enabled = enabled
+        self.rules: List[CacheRule] = []
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self._hits = metrics.counter("response_cache_hits_total")
+        self._misses = metrics.counter("response_cache_misses_total")
+        self._coalesced = metrics.counter("response_cache_coalesced_total")
+
+    def match(self, path: str) -> Optional[CacheRule]:
+        return next((rule for rule in self.rules if rule.pattern.match(path)), None)
+
+    @staticmethod
+    def cache_key(scope: Scope) -> str:
+        # same parameters in any order (or repeated blanks) hit the same entry
+        query = sorted(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True))
+        return f"{scope['path']}?{urlencode(query)}"
+
+    def generation(self, tag: str) -> int:
+        with self._lock:
+            return self._generations.get(tag, 0)
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                self.backend.invalidate(tag)
+
+    def store(self, key: str, response: CachedResponse, generation: int):
+        # skip responses computed before an invalidation that landed while they were in flight
+        with self._lock:
+            if self._generations.get(response.tag, 0) == generation:
+                self.backend.set(key, response)
+
+
+response_cache = ResponseCache(_load_backend())
+
+
+class ResponseCacheMiddleware:
+    """Serves matching anonymous GETs from `response_cache`; concurrent misses share one computation"""
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.enabled:
+            return await self.app(scope, receive, send)
+
+        rule = self.cache.match(scope["path"])
+        request = Request(scope)
+        # responses for a logged-in caller may be personalised, so they are never shared
+        if rule is None or "authorization" in request.headers:
+            return await self.app(scope, receive, send)
+
+        key = ResponseCache.cache_key(scope)
+        cached = self.cache.backend.get(key)
+        if cached is not None:
+            self.cache._hits.inc()
+            return await self._replay(request, cached, send, b"HIT")
+
+        leader = self.cache._in_flight.get(key)
+        if leader is not None:
+            self.cache._coalesced.inc()
+            cached = await asyncio.shield(leader)
+            if cached is not None:
+                return await self._replay(request, cached, send, b"HIT")
+            return await self.app(scope, receive, send)
+
+        self.cache._misses.inc()
+        future = asyncio.get_running_loop().create_future()
+        self.cache._in_flight[key] = future
+        generation = self.cache.generation(rule.tag)
+        cached = None
+        try:
+            start, body = await self._capture(scope, receive)
+            if start["status"] == 200:
+                cached = CachedResponse(200, list(start.get("headers", [])), body, rule.tag, rule.ttl_seconds)
+                self.cache.store(key, cached, generation)
+        finally:
+            del self.cache._in_flight[key]
+            future.set_result(cached)
+
+        if cached is not None:
+            return await self._replay(request, cached, send, b"MISS")
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
+
+    async def _capture(self, scope: Scope, receive: Receive) -> Tuple[Message, bytes]:
+        inner_scope = dict(scope)
+        inner_scope["headers"] = [(name, value) for name, value in scope["headers"] if name not in CONDITIONAL_HEADERS]
+        start: Message = {}
+        chunks: List[bytes] = []
+
+        async def capture_send(message: Message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(inner_scope, receive, capture_send)
+        return start, b"".join(chunks)
+
+    @staticmethod
+    async def _replay(request: Request, cached: CachedResponse, send: Send, cache_status: bytes):
+        if cached.etag is not None and etag_matches(request, cached.etag):
+            headers = [(name, value) for name, value in cached.headers if name in (b"etag", b"last-modified")]
+            await send({"type": "http.response.start", "status": 304, "headers": headers + [(b"x-cache", cache_status)]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers, body = cached.headers, cached.body
+        encoding = negotiate(request.headers.get("accept-encoding", ""))
+        if encoding in cached.variants:
+            body = cached.variants[encoding]
+            headers = encoded_headers(headers, encoding, len(body))
+        elif cached.variants:
+            headers = headers + [(b"vary", b"Accept-Encoding")]
+
+        await send({"type": "http.response.start", "status": cached.status, "headers": headers + [(b"x-cache", cache_status)]})
+        await send({"type": "http.response.body", "body": body})
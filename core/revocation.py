@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from core.metrics import metrics
+from models.refresh_token import RefreshToken
+from models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", 100000))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+REVOCATION_RECENT_SIZE = int(os.getenv("REVOCATION_RECENT_SIZE", 10000))
+# how often revocations made by other workers are pulled in, and expired rows pruned
+REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", 30))
+REVOCATION_PRUNE_SECONDS = int(os.getenv("REVOCATION_PRUNE_SECONDS", 3600))
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # double hashing: k positions from two 64-bit halves of one sha256
+        digest = hashlib.sha256(item.encode()).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:16], "big") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationStore:
+    """Revoked token ids, checked on every token verification without a database round trip.
+
+    The revoked_tokens table is the source of truth. Each process keeps a bloom filter
+    of every revoked jti it knows about plus an exact LRU of the most recent ones: a
+    bloom miss means "not revoked" with no I/O, a recent-set hit means "revoked", and
+    only the rare bloom false positive (or an old entry) falls through to the table.
+    Revocations made by other workers are pulled in every REVOCATION_SYNC_SECONDS.
+    """
+
+    def __init__(self, capacity: int = REVOCATION_BLOOM_CAPACITY, error_rate: float = REVOCATION_BLOOM_ERROR_RATE,
+                 recent_size: int = REVOCATION_RECENT_SIZE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.recent_size = recent_size
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._synced_at: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._db_checks = metrics.counter("token_revocation_db_checks_total")
+        metrics.gauge("token_revocation_recent_entries", lambda: len(self._recent))
+
+    def _remember(self, jti: str, expires_at: float):
+        # caller holds the lock
+        self._bloom.add(jti)
+        self._recent[jti] = expires_at
+        self._recent.move_to_end(jti)
+        while len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
+
+    def revoke(self, db: Session, jti: str, expires_at: datetime):
+        db.execute(
+            pg_insert(RevokedToken).values(jti=jti, expires_at=expires_at).on_conflict_do_nothing(
+                index_elements=[RevokedToken.jti]
+            )
+        )
+        db.commit()
+        with self._lock:
+            self._remember(jti, expires_at.timestamp())
+
+    def is_revoked(self, jti: str) -> bool:
+        with self._lock:
+            if jti not in self._bloom:
+                return False
+            if jti in self._recent:
+                return True
+
+        self._db_checks.inc()
+        db = SessionLocal()
+        try:
+            return db.scalar(select(RevokedToken.jti).where(RevokedToken.jti == jti)) is not None
+        except Exception as e:
+            # fail closed: a token we can't vouch for is treated as revoked
+            logger.error(f"revocation lookup failed: {e}")
+            return True
+        finally:
+            db.close()
+
+    def load(self, db: Session):
+        """Rebuild the filter from every unexpired revocation in the table"""
+        now = datetime.now(timezone.utc)
+        rows = db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+            .order_by(RevokedToken.revoked_at)
+        ).all()
+
+        bloom = BloomFilter(max(self.capacity, len(rows) * 2), self.error_rate)
+        for row in rows:
+            bloom.add(row.jti)
+
+        with self._lock:
+            self._bloom = bloom
+            self._recent = OrderedDict(
+                (jti, expires_at) for jti, expires_at in self._recent.items() if expires_at > time.time()
+            )
+            for row in rows[-self.recent_size:]:
+                self._remember(row.jti, row.expires_at.timestamp())
+            self._synced_at = now
+
+    def sync(self, db: Session):
+        """Pick up revocations other workers made since the last sync"""
+        if self._synced_at is None:
+            self.load(db)
+            return
+
+        # overlap the window so clock skew between app and database can't skip rows
+        since = self._synced_at - timedelta(seconds=REVOCATION_SYNC_SECONDS)
+        now = datetime.now(timezone.utc)
+        rows = db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.revoked_at >= since)
+        ).all()
+        with self._lock:
+            for row in rows:
+                self._remember(row.jti, row.expires_at.timestamp())
+            self._synced_at = now
+
+    def prune(self, db: Session):
+        """Drop expired revocation and refresh-token rows; those tokens fail the exp check anyway"""
+        now = datetime.now(timezone.utc)
+        db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+        db.commit()
+        self.load(db)
+
+    def _run(self):
+        last_prune = time.monotonic()
+        while not self._stop.wait(REVOCATION_SYNC_SECONDS):
+            db = SessionLocal()
+            try:
+                if time.monotonic() - last_prune >= REVOCATION_PRUNE_SECONDS:
+                    self.prune(db)
+                    last_prune = time.monotonic()
+                else:
+                    self.sync(db)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"token revocation sync failed: {e}")
+            finally:
+                db.close()
+
+    def start(self):
+        db = SessionLocal()
+        try:
+            self.load(db)
+        except Exception as e:
+            logger.error(f"could not load revoked tokens: {e}")
+        finally:
+            db.close()
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="token-revocation", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+revocation_store = RevocationStore()
@@ -1,4 +1,9 @@
+import hashlib
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from uuid import UUID
 
 from dotenv import load_dotenv
@@ -6,12 +11,16 @@ from fastapi import Depends, HTTPException,status
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime,timedelta,timezone
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 
+from core.hashing import hashing_executor
+from core.revocation import revocation_store
 from models import User
+from models.user import Roles
+from schema.user import UserPrincipal
 
 security = HTTPBearer()
 
@@ -21,16 +30,43 @@ JWT_SECRET_KEY =os.getenv("JWT_SECRET_KEY")
 JWT_ALGORITHM =os.getenv("JWT_ALGORITHM")
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 JWT_REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+# pick a value for this host with `python calibrate_bcrypt.py`
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+AUTH_USER_CACHE_TTL_SECONDS = int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated= "auto")
+# min == max == default, so any stored hash with a different cost (higher or lower) needs_update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated= "auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
-def hash_password(password:str) -> str:
+# module-level so they can be shipped to a process pool
+def _hash_password_sync(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str)-> bool:
+def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def _verify_and_update_password_sync(plain_password: str, hashed_password: str):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def hash_password(password:str) -> str:
+    # raises HashingBusyError when the hashing pool and its queue are full
+    return hashing_executor.run(_hash_password_sync, password)
+
+def verify_password(plain_password: str, hashed_password: str)-> bool:
+    return hashing_executor.run(_verify_password_sync, plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify, and return a fresh hash if the stored one was made with a different cost"""
+    return hashing_executor.run(_verify_and_update_password_sync, plain_password, hashed_password)
+
 
 #JWT TOKEN SECTION
 
@@ -40,75 +76,216 @@ def create_access_token(data:dict, expires_delta:Optional[timedelta]=None):
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp" : expire, "type": "access"})
+    to_encode.update({"exp" : expire, "type": "access", "jti": str(uuid.uuid4())})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, JWT_ALGORITHM)
     return encoded_jwt
 
-def create_refresh_token(data: dict) -> str:
+def create_refresh_token(data: dict, family_id: Optional[UUID] = None) -> str:
+    # tokens are stored and rotated by RefreshTokenCRUD; family_id ties every rotation of one login together
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=JWT_REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp":expire, "type": "refresh"})
+    to_encode.update({"exp":expire, "type": "refresh", "jti": str(uuid.uuid4())})
+    if family_id is not None:
+        to_encode["fam"] = str(family_id)
     encoded_jwt = jwt.encode(to_encode,JWT_SECRET_KEY,JWT_ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str, token_type: str = "access")->Optional[dict]:
-    #this function is to verify and decode jwt token
+class VerifiedTokenCache:
+    """Bounded LRU of already-verified token payloads.
+
+    Keys are sha256 digests of the raw token, so the cache never holds usable tokens.
+    Each entry dies at the token's own `exp`; a hit skips the signature check entirely.
+    """
+
+    def __init__(self, max_size: int = JWT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes) -> Optional[dict]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                return None
+            if payload["exp"] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: bytes, payload: dict):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache()
+
+
+def _decode_token(token: str) -> Optional[dict]:
+    # full signature and expiry check, no cache
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, JWT_ALGORITHM)
+    except JWTError:
+        return None
 
-        if payload.get("type") != token_type:
-            return None
+    expiry = payload.get("exp")
+    if expiry is None or expiry <= time.time():
+        return None
 
-        expiry = payload.get("exp")
-        if expiry is None:
-            return None
+    return payload
+
+def verify_token(token: str, token_type: str = "access")->Optional[dict]:
+    #this function is to verify and decode jwt token
+    key = VerifiedTokenCache.key(token)
+    payload = token_cache.get(key)
 
-        if datetime.fromtimestamp(expiry, tz=timezone.utc) < datetime.now(timezone.utc):
+    if payload is None:
+        payload = _decode_token(token)
+        if payload is None:
             return None
+        token_cache.set(key, payload)
 
-        return payload
+    if payload.get("type") != token_type:
+        return None
 
-    except JWTError:
-        None
+    # bloom-filter fast path; tokens issued before jti existed can't be revoked
+    jti = payload.get("jti")
+    if jti is not None and revocation_store.is_revoked(jti):
+        return None
+
+    return dict(payload)
+
+
+def revoke_token(db: Session, payload: dict):
+    """Revoke a verified token until its own expiry"""
+    jti = payload.get("jti")
+    if jti is None:
+        return
+    revocation_store.revoke(db, jti, datetime.fromtimestamp(payload["exp"], tz=timezone.utc))
 from core.database import get_db
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db : Session = Depends(get_db)):
-    print("GET_CURRENT_USER CALLED!")  # This should print if dependency runs
-    print(f"Credentials: {credentials}")
-    from crud.user import UserCRUD
 
-    credentials_exception = HTTPException(
+class PrincipalCache:
+    """Short-TTL cache of authenticated users, so protected routes skip the users SELECT"""
+
+    def __init__(self, ttl_seconds: int = AUTH_USER_CACHE_TTL_SECONDS, max_size: int = AUTH_USER_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[UUID, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID) -> Optional[UserPrincipal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            return principal
+
+    def set(self, user_id: UUID, principal: UserPrincipal):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},)
 
+
+def _access_token_payload(credentials: HTTPAuthorizationCredentials) -> dict:
+    payload = verify_token(credentials.credentials, token_type="access")
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def _load_principal(payload: dict, db: Session) -> UserPrincipal:
+    from crud.user import UserCRUD
+
     try:
-        token = credentials.credentials
+        user_id = UUID(payload["sub"])
+    except ValueError:
+        raise _credentials_exception()
 
-        payload = verify_token(token, token_type="access")
-        if payload is None:
-            raise credentials_exception
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = UserCRUD.get_user_by_id(db, user_id)
+        if user is None:
+            raise _credentials_exception()
+        principal = UserPrincipal.model_validate(user)
+        principal_cache.set(user_id, principal)
 
-        user_id_str: str = payload.get("sub")
-        if user_id_str is None:
-            raise credentials_exception
-        user_id = UUID(user_id_str)
-    except (JWTError, ValueError):
-        raise credentials_exception
+    return principal
 
-    user = UserCRUD.get_user_by_id(db,user_id)
-    if user is None:
-        raise credentials_exception
 
-    return user
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db : Session = Depends(get_db)):
+    payload = _access_token_payload(credentials)
+    return _load_principal(payload, db)
 
 
-def require_admin(current_user: User = Depends(get_current_user)):
-    from crud.user import UserCRUD
+def preload_principal(credentials: Optional[HTTPAuthorizationCredentials], db: Session) -> Optional[UserPrincipal]:
+    """Resolve a bearer token into `principal_cache` ahead of requests that will all use it.
+
+    Invalid or missing credentials return None; the requests themselves report the 401.
+    """
+    if credentials is None:
+        return None
+    try:
+        return _load_principal(_access_token_payload(credentials), db)
+    except HTTPException:
+        return None
+
+
+def require_admin(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
     """Require admin role for protected routes"""
+    from crud.user import UserCRUD
+
+    admin_required = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Admin access required"
+    )
+
+    payload = _access_token_payload(credentials)
+    # tokens carry the role claim, so non-admins are turned away before any lookup
+    role = payload.get("role")
+    if role is not None and role != Roles.ADMIN.value:
+        raise admin_required
+
+    current_user = _load_principal(payload, db)
     if not UserCRUD.is_admin(current_user):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required"
-        )
-    return current_user
\ No newline at end of file
+        raise admin_required
+    return current_user
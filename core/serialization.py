@@ -0,0 +1,23 @@
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    """One TypeAdapter per response type, built on first use and reused for every request"""
+    return TypeAdapter(response_type)
+
+
+def json_response(response_type: Any, content: Any, status_code: int = status.HTTP_200_OK,
+                  exclude_none: bool = False) -> Response:
+    """Validate `content` (row mappings, dicts or ORM objects) and encode it to JSON in pydantic-core.
+
+    Returning this from a route skips FastAPI's own response_model pass (validate, then
+    jsonable_encoder, then json.dumps); keep response_model on the route for the OpenAPI schema.
+    """
+    adapter = type_adapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True), exclude_none=exclude_none)
+    return Response(content=body, status_code=status_code, media_type="application/json")
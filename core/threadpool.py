@@ -0,0 +1,47 @@
+import logging
+import os
+
+from anyio import to_thread
+
+from core.database import MAX_OVERFLOW, POOL_SIZE
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# threads for sync routes and dependencies; unset means "DB pool capacity + THREADPOOL_HEADROOM"
+THREADPOOL_SIZE = os.getenv("THREADPOOL_SIZE")
+# threads beyond the DB pool for work that holds no connection (cache hits, token checks, waiting on bcrypt)
+THREADPOOL_HEADROOM = int(os.getenv("THREADPOOL_HEADROOM", 10))
+
+
+def threadpool_size() -> int:
+    if THREADPOOL_SIZE:
+        return int(THREADPOOL_SIZE)
+    return POOL_SIZE + MAX_OVERFLOW + THREADPOOL_HEADROOM
+
+
+_limiter = None
+
+
+def _statistic(name: str) -> float:
+    return getattr(_limiter.statistics(), name) if _limiter is not None else 0
+
+
+metrics.gauge("threadpool_size", lambda: _statistic("total_tokens"))
+metrics.gauge("threadpool_in_use", lambda: _statistic("borrowed_tokens"))
+# requests waiting for a thread, as opposed to threads waiting for a DB connection
+metrics.gauge("threadpool_waiting", lambda: _statistic("tasks_waiting"))
+
+
+def configure_threadpool():
+    """Size AnyIO's default thread limiter, which every sync `def` route runs under.
+
+    Fewer threads than pooled connections leaves connections idle while requests queue for
+    a thread; far more just moves the queue into the pool checkout. Must run on the event
+    loop (lifespan), since the limiter belongs to the running loop.
+    """
+    global _limiter
+    _limiter = to_thread.current_default_thread_limiter()
+    _limiter.total_tokens = threadpool_size()
+    logger.info(f"threadpool sized to {_limiter.total_tokens} threads (DB pool {POOL_SIZE}+{MAX_OVERFLOW})")
+    return _limiter
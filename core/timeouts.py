@@ -0,0 +1,90 @@
+import asyncio
+import logging
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.database import cancel_queries
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATEs: statement_timeout (or a cancel request) and lock_timeout
+QUERY_CANCELED = "57014"
+LOCK_NOT_AVAILABLE = "55P03"
+
+_cancelled_on_disconnect = metrics.counter("db_queries_cancelled_on_disconnect_total")
+
+
+class QueryCancellationMiddleware:
+    """Cancels a request's in-flight database statements when its client disconnects.
+
+    Sync routes keep running in their thread after the client is gone, so without this a
+    slow search holds its connection until statement_timeout. This middleware is the only
+    reader of `receive`: it forwards request body messages to the app and watches for
+    http.disconnect in the background. `get_db` registers its sessions in scope["db_sessions"];
+    scope["client_disconnected"] marks the resulting 57014 as a cancel rather than a timeout.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        sessions = scope["db_sessions"] = []
+        messages: "asyncio.Queue[Message]" = asyncio.Queue()
+
+        async def watch():
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    break
+            # set before cancelling, so the route's QueryCanceled is never mistaken for a timeout
+            scope["client_disconnected"] = True
+            cancelled = await asyncio.get_running_loop().run_in_executor(None, cancel_queries, sessions)
+            if cancelled:
+                _cancelled_on_disconnect.inc(cancelled)
+
+        async def forward_receive() -> Message:
+            message = await messages.get()
+            if message["type"] == "http.disconnect":
+                # every later call sees the disconnect too
+                messages.put_nowait(message)
+            return message
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await self.app(scope, forward_receive, send)
+        finally:
+            # sessions are closed by now; servers also report a disconnect once the response is sent
+            watcher.cancel()
+
+
+async def database_timeout_handler(request: Request, exc: OperationalError):
+    """statement_timeout -> 504, lock_timeout -> 503 with Retry-After; other database errors stay 500s"""
+    code = getattr(exc.orig, "pgcode", None)
+    group = getattr(request.state, "db_timeout_group", "default")
+
+    if code == LOCK_NOT_AVAILABLE:
+        metrics.counter(f"db_lock_timeouts_total:{group}").inc()
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Resource is busy, please retry shortly"},
+            headers={"Retry-After": "1"},
+        )
+    if code == QUERY_CANCELED and request.scope.get("client_disconnected"):
+        # cancelled by QueryCancellationMiddleware; nobody is left to read the response
+        return JSONResponse(status_code=status.HTTP_504_GATEWAY_TIMEOUT, content={"detail": "Client disconnected"})
+    if code == QUERY_CANCELED:
+        metrics.counter(f"db_statement_timeouts_total:{group}").inc()
+        logger.warning(f"statement timed out on {request.method} {request.url.path}")
+        return JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content={"detail": "Database query timed out"},
+        )
+    raise exc
@@ -1,14 +1,23 @@
-from typing import List, Optional
+from typing import Optional, Set
 from uuid import UUID
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import OperationalError
 from fastapi import HTTPException, status
 
+from core.fields import narrow_columns
+from core.response_cache import response_cache
+from crud.leaderboard import service_leaderboard
 from models.booking import Booking, BookingStatus
 from models.service import Service
 from schema.booking import BookingCreate, BookingUpdate, BookingQuery
 
+# what BookingResponse needs plus the row version for ETags; list reads select these instead of building Booking objects
+LIST_COLUMNS = (
+    Booking.id, Booking.user_id, Booking.service_id, Booking.start_time,
+    Booking.end_time, Booking.status, Booking.created_at, Booking.updated_at,
+)
 
 class BookingCRUD:
     @staticmethod
@@ -17,27 +26,32 @@ class BookingCRUD:
         return db.query(Booking).filter(Booking.id == booking_id).first()
 
     @staticmethod
-    def get_user_bookings(db: Session, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Booking]:
-        """Get all bookings for a specific user"""
-        return db.query(Booking).filter(Booking.user_id == user_id).offset(skip).limit(limit).all()
+    def get_user_bookings(db: Session, user_id: UUID, skip: int = 0, limit: int = 100,
+                          fields: Optional[Set[str]] = None) -> list:
+        """Get all bookings for a specific user, as LIST_COLUMNS mappings"""
+        return BookingCRUD.get_all_bookings(db, BookingQuery(), skip, limit, user_id=user_id, fields=fields)
 
     @staticmethod
-    def get_all_bookings(db: Session, query_params: BookingQuery, skip: int = 0, limit: int = 100) -> List[Booking]:
+    def get_all_bookings(db: Session, query_params: BookingQuery, skip: int = 0, limit: int = 100,
+                         user_id: Optional[UUID] = None, fields: Optional[Set[str]] = None) -> list:
+        """Bookings matching `query_params` (only `user_id`'s when given); `fields` narrows the selected columns"""
+        query = select(*narrow_columns(LIST_COLUMNS, fields, always=("id", "updated_at")))
 
-        query = db.query(Booking)
+        if user_id is not None:
+            query = query.where(Booking.user_id == user_id)
 
 
         if query_params.status:
-            query = query.filter(Booking.status == query_params.status)
+            query = query.where(Booking.status == query_params.status)
 
 
         if query_params.from_date:
-            query = query.filter(Booking.start_time >= query_params.from_date)
+            query = query.where(Booking.start_time >= query_params.from_date)
 
         if query_params.to_date:
-            query = query.filter(Booking.end_time <= query_params.to_date)
+            query = query.where(Booking.end_time <= query_params.to_date)
 
-        return query.offset(skip).limit(limit).all()
+        return db.execute(query.offset(skip).limit(limit)).mappings().all()
 
     @staticmethod
     def check_booking_conflicts(db: Session, service_id: UUID, start_time: datetime, end_time: datetime,
@@ -65,9 +79,11 @@ class BookingCRUD:
         return query.first() is not None
 
     @staticmethod
-    def create_booking(db: Session, booking_data: BookingCreate, user_id: UUID) -> Booking:
+    def create_booking(db: Session, booking_data: BookingCreate, user_id: UUID, commit: bool = True) -> Booking:
 
-        service = db.query(Service).filter(Service.id == booking_data.service_id).first()
+        service = db.query(Service).filter(
+            Service.id == booking_data.service_id, Service.deleted_at.is_(None)
+        ).first()
         if not service:
             raise ValueError("Service not found")
         if not service.is_active:
@@ -97,9 +113,16 @@ class BookingCRUD:
 
         try:
             db.add(new_booking)
-            db.commit()
+            if commit:
+                db.commit()
+            else:
+                # the caller commits, e.g. together with the stored idempotent response
+                db.flush()
             db.refresh(new_booking)
             return new_booking
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise ValueError(f"Failed to create booking: {str(e)}")
@@ -153,6 +176,9 @@ class BookingCRUD:
             db.commit()
             db.refresh(booking)
             return booking
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise ValueError(f"Failed to update booking: {str(e)}")
@@ -173,10 +199,21 @@ class BookingCRUD:
             if booking.start_time <= datetime.now(timezone.utc):
                 raise ValueError("Cannot delete booking after start time")
 
+        # its review goes with it (ON DELETE CASCADE), so take it off the leaderboard too
+        service_id = booking.service_id
+        review = booking.review
+        rating = review.rating if review is not None else None
+
         try:
             db.delete(booking)
             db.commit()
+            if rating is not None:
+                service_leaderboard.apply_review_change(service_id, -1, -rating)
+            response_cache.invalidate("reviews")
             return True
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise ValueError(f"Failed to delete booking: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, literal
+from sqlalchemy.orm import Session
+
+from models.booking import Booking
+from models.review import Review
+from models.service import Service
+
+# m in the bayesian formula: how many "average" reviews every service starts with
+PRIOR_WEIGHT = float(os.getenv("LEADERBOARD_PRIOR_WEIGHT", 5))
+# full resync from the database every so often, so other workers' writes and service edits show up
+REFRESH_SECONDS = int(os.getenv("LEADERBOARD_REFRESH_SECONDS", 600))
+
+
+class ServiceLeaderboard:
+    """In-memory ranking of active services by bayesian-weighted rating.
+
+    The first read (and every REFRESH_SECONDS after) ranks services with one SQL query.
+    Between full loads, review writes adjust the per-service count/sum in place and
+    only the in-memory ranking is recomputed, so reads never aggregate reviews.
+    """
+
+    def __init__(self, prior_weight: float = PRIOR_WEIGHT, refresh_seconds: int = REFRESH_SECONDS):
+        self.prior_weight = prior_weight
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[UUID, dict] = {}
+        self._ranking: List[dict] = []
+        self._review_count = 0
+        self._rating_sum = 0
+        self._loaded_at: Optional[float] = None
+
+    @staticmethod
+    def ranking_query(db: Session, prior_weight: float):
+        """Active services with review count, rating sum and weighted rating, best first"""
+        review_totals = db.query(
+            Booking.service_id.label("service_id"),
+            func.count(Review.id).label("review_count"),
+            func.sum(Review.rating).label("rating_sum"),
+        ).join(Booking, Review.booking_id == Booking.id).group_by(Booking.service_id).subquery()
+
+        review_count = func.coalesce(review_totals.c.review_count, 0)
+        rating_sum = func.coalesce(review_totals.c.rating_sum, 0)
+        global_mean = func.coalesce(
+            func.sum(rating_sum).over() * 1.0 / func.nullif(func.sum(review_count).over(), 0), 0
+        )
+        weighted_rating = (rating_sum + literal(prior_weight) * global_mean) / (review_count + literal(prior_weight))
+
+        return db.query(
+            Service,
+            review_count.label("review_count"),
+            rating_sum.label("rating_sum"),
+            weighted_rating.label("weighted_rating"),
+        ).outerjoin(review_totals, review_totals.c.service_id == Service.id).filter(
+            Service.is_active == True, Service.deleted_at.is_(None)
+        ).order_by(weighted_rating.desc(), review_count.desc())
+
+    def _load(self, db: Session):
+        rows = ServiceLeaderboard.ranking_query(db, self.prior_weight).all()
+
+        entries = {}
+        for service, review_count, rating_sum, _ in rows:
+            entries[service.id] = {
+                "id": service.id,
+                "title": service.title,
+                "description": service.description,
+                "price": service.price,
+                "duration_minutes": service.duration_minutes,
+                "is_active": service.is_active,
+                "created_at": service.created_at,
+                "review_count": int(review_count),
+                "rating_sum": int(rating_sum),
+            }
+
+        self._entries = entries
+        self._review_count = sum(entry["review_count"] for entry in entries.values())
+        self._rating_sum = sum(entry["rating_sum"] for entry in entries.values())
+        self._rerank()
+        self._loaded_at = time.monotonic()
+
+    def _rerank(self):
+        # same formula as ranking_query, applied to the cached aggregates
+        global_mean = self._rating_sum / self._review_count if self._review_count else 0.0
+        ranking = []
+        for entry in self._entries.values():
+            count = entry["review_count"]
+            ranking.append({
+                **{k: v for k, v in entry.items() if k not in ("review_count", "rating_sum")},
+                "total_reviews": count,
+                "average_rating": round(entry["rating_sum"] / count, 2) if count else 0.0,
+                "weighted_rating": round(
+                    (entry["rating_sum"] + self.prior_weight * global_mean) / (count + self.prior_weight), 4
+                ),
+            })
+        ranking.sort(key=lambda item: (item["weighted_rating"], item["total_reviews"]), reverse=True)
+        self._ranking = ranking
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds
+
+    def top(self, db: Session, limit: int = 10) -> List[dict]:
+        with self._lock:
+            if self._is_stale():
+                self._load(db)
+            return self._ranking[:limit]
+
+    def apply_review_change(self, service_id: UUID, count_delta: int, rating_delta: int):
+        """Fold a committed review insert/update/delete into the cached ranking"""
+        with self._lock:
+            entry = self._entries.get(service_id)
+            if self._loaded_at is None or entry is None:
+                return
+            entry["review_count"] += count_delta
+            entry["rating_sum"] += rating_delta
+            self._review_count += count_delta
+            self._rating_sum += rating_delta
+            self._rerank()
+
+    def invalidate(self):
+        """Force a full reload on the next read (e.g. a service was edited or removed)"""
+        with self._lock:
+            self._loaded_at = None
+
+
+service_leaderboard = ServiceLeaderboard()
@@ -0,0 +1,120 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from core.response_cache import response_cache
+from models.archive import ArchivedBooking, ArchivedReview, ArchivedService
+from models.booking import Booking
+from models.review import Review
+from models.service import Service
+
+logger = logging.getLogger(__name__)
+
+PURGE_ENABLED = os.getenv("SERVICE_PURGE_ENABLED", "True") == "True"
+PURGE_INTERVAL_SECONDS = int(os.getenv("SERVICE_PURGE_INTERVAL_SECONDS", 300))
+# how long a soft-deleted service stays restorable before it is archived
+PURGE_AFTER_DAYS = int(os.getenv("SERVICE_PURGE_AFTER_DAYS", 7))
+PURGE_BATCH_SIZE = int(os.getenv("SERVICE_PURGE_BATCH_SIZE", 500))
+
+
+class ServicePurge:
+    """Moves soft-deleted services and their bookings/reviews into the archive tables.
+
+    Every move is one `WITH moved AS (DELETE ... RETURNING) INSERT INTO archived_... SELECT`
+    statement, and each batch of bookings goes together with its reviews in one short
+    transaction, so no lock is held for long and the work can stop and resume anywhere.
+    """
+
+    @staticmethod
+    def _move(db: Session, model, archive_model, id_subquery, commit: bool = True) -> int:
+        columns = [column.name for column in model.__table__.columns]
+        moved = delete(model).where(model.id.in_(id_subquery)).returning(
+            *[model.__table__.c[name] for name in columns]
+        ).cte("moved")
+        result = db.execute(
+            insert(archive_model).from_select(columns, select(*[moved.c[name] for name in columns]))
+        )
+        if commit:
+            db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def purge_service(db: Session, service_id: UUID, batch_size: int = PURGE_BATCH_SIZE):
+        while True:
+            # FOR UPDATE blocks review inserts on these bookings (their FK check needs a key-share
+            # lock) until the batch commits, so none can slip in between archiving the reviews and
+            # the booking delete that would cascade them away unarchived
+            booking_ids = list(db.scalars(
+                select(Booking.id).where(Booking.service_id == service_id).limit(batch_size).with_for_update()
+            ))
+            if booking_ids:
+                ServicePurge._move(db, Review, ArchivedReview,
+                                   select(Review.id).where(Review.booking_id.in_(booking_ids)).scalar_subquery(),
+                                   commit=False)
+                ServicePurge._move(db, Booking, ArchivedBooking,
+                                   select(Booking.id).where(Booking.id.in_(booking_ids)).scalar_subquery(),
+                                   commit=False)
+            db.commit()
+            if len(booking_ids) < batch_size:
+                break
+
+        ServicePurge._move(db, Service, ArchivedService, select(Service.id).where(Service.id == service_id).scalar_subquery())
+
+    @staticmethod
+    def due_services(db: Session, older_than: datetime, limit: int) -> List[UUID]:
+        return list(db.scalars(
+            select(Service.id).where(Service.deleted_at < older_than).order_by(Service.deleted_at).limit(limit)
+        ))
+
+    @staticmethod
+    def run_once(purge_after_days: int = PURGE_AFTER_DAYS, batch_size: int = PURGE_BATCH_SIZE) -> int:
+        """Archive every service soft-deleted more than `purge_after_days` ago; returns how many"""
+        db = SessionLocal()
+        purged = 0
+        try:
+            older_than = datetime.now(timezone.utc) - timedelta(days=purge_after_days)
+            for service_id in ServicePurge.due_services(db, older_than, batch_size):
+                ServicePurge.purge_service(db, service_id, batch_size)
+                purged += 1
+                response_cache.invalidate("reviews")
+                logger.info(f"archived deleted service {service_id}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"service purge failed: {e}")
+        finally:
+            db.close()
+        return purged
+
+
+class ServicePurgeWorker:
+    """Daemon thread that runs ServicePurge.run_once every PURGE_INTERVAL_SECONDS"""
+
+    def __init__(self, interval_seconds: int = PURGE_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            ServicePurge.run_once()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="service-purge", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+service_purge_worker = ServicePurgeWorker()
@@ -0,0 +1,107 @@
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from uuid import UUID
+from jose import jwt
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.security import create_refresh_token
+from models.refresh_token import RefreshToken
+from models.user import User, Roles
+
+
+class RefreshTokenCRUD:
+    @staticmethod
+    def hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def issue(db: Session, user_id: UUID, family_id: Optional[UUID] = None, commit: bool = True) -> str:
+        """Create a refresh token and store its hash; a new login starts a new family"""
+        family_id = family_id or uuid.uuid4()
+        token = create_refresh_token(data={"sub": str(user_id)}, family_id=family_id)
+        expires_at = datetime.fromtimestamp(jwt.get_unverified_claims(token)["exp"], tz=timezone.utc)
+
+        db.add(RefreshToken(
+            family_id=family_id,
+            user_id=user_id,
+            token_hash=RefreshTokenCRUD.hash_token(token),
+            expires_at=expires_at
+        ))
+        if commit:
+            db.commit()
+        return token
+
+    @staticmethod
+    def rotate(db: Session, token: str, payload: dict) -> Tuple[UUID, Roles, str]:
+        """Spend a refresh token and issue its successor in the same family.
+
+        The happy path is one UPDATE ... FROM users ... RETURNING on the unique token_hash
+        index plus one INSERT. Presenting a token that was already spent means it leaked
+        (or the client replayed it), so the whole family is revoked.
+        """
+        token_hash = RefreshTokenCRUD.hash_token(token)
+
+        spent = db.execute(
+            update(RefreshToken).where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.user_id == User.id
+            ).values(used_at=func.now()).returning(RefreshToken.family_id, User.id, User.role)
+        ).first()
+
+        if spent is None:
+            return RefreshTokenCRUD._rotate_unspendable(db, token_hash, payload)
+
+        new_token = RefreshTokenCRUD.issue(db, spent.id, spent.family_id, commit=False)
+        db.commit()
+        return spent.id, spent.role, new_token
+
+    @staticmethod
+    def _rotate_unspendable(db: Session, token_hash: str, payload: dict) -> Tuple[UUID, Roles, str]:
+        existing = db.query(RefreshToken).filter(RefreshToken.token_hash == token_hash).first()
+
+        if existing is None:
+            # issued before rotation existed: accept once and move it into a fresh family
+            if payload.get("fam") is None:
+                user = db.query(User).filter(User.id == UUID(payload["sub"])).first()
+                if user is None:
+                    raise ValueError("User not found")
+                # recorded as spent in the new family, so a replay is caught as reuse like any other token
+                family_id = uuid.uuid4()
+                db.add(RefreshToken(
+                    family_id=family_id,
+                    user_id=user.id,
+                    token_hash=token_hash,
+                    expires_at=datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
+                    used_at=func.now()
+                ))
+                new_token = RefreshTokenCRUD.issue(db, user.id, family_id, commit=False)
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # a concurrent replay of the same token got there first
+                    db.rollback()
+                    raise ValueError("Refresh token reuse detected")
+                return user.id, user.role, new_token
+            raise ValueError("Invalid refresh token")
+
+        if existing.used_at is not None and existing.revoked_at is None:
+            RefreshTokenCRUD.revoke_family(db, existing.family_id)
+            raise ValueError("Refresh token reuse detected")
+
+        raise ValueError("Invalid refresh token")
+
+    @staticmethod
+    def revoke_family(db: Session, family_id: UUID):
+        db.execute(
+            update(RefreshToken).where(
+                RefreshToken.family_id == family_id,
+                RefreshToken.revoked_at.is_(None)
+            ).values(revoked_at=func.now())
+        )
+        db.commit()
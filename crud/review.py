@@ -1,13 +1,22 @@
-from typing import List, Optional
+import uuid
+from typing import Dict, List, Optional, Set
 from uuid import UUID
+from sqlalchemy import event, func, literal, select, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import OperationalError
 
+from core.fields import narrow_columns
+from core.response_cache import response_cache
+from crud.leaderboard import service_leaderboard
 from models.review import Review
 from models.booking import Booking, BookingStatus
 from models.service import Service
-from schema.review import ReviewCreate, ReviewUpdate
+from models.user import User
+from schema.review import ReviewCreate, ReviewUpdate, ReviewInclude
 
+# exactly what ReviewResponse needs; list reads select these instead of building Review objects
+LIST_COLUMNS = (Review.id, Review.booking_id, Review.rating, Review.comment, Review.created_at)
 
 class ReviewCRUD:
     @staticmethod
@@ -21,54 +30,111 @@ class ReviewCRUD:
         return db.query(Review).filter(Review.booking_id == booking_id).first()
 
     @staticmethod
-    def get_service_reviews(db: Session, service_id: UUID, skip: int = 0, limit: int = 100) -> List[Review]:
+    def _list_statement(include: Optional[Set[ReviewInclude]], fields: Optional[Set[str]] = None):
+        """Review columns (narrowed to `fields`) joined with bookings plus whatever related columns `include` asks for"""
+        include = include or set()
+        columns = narrow_columns(LIST_COLUMNS, fields)
+        if ReviewInclude.REVIEWER in include:
+            columns += [User.id.label("reviewer_id"), User.name.label("reviewer_name")]
+        if ReviewInclude.BOOKING in include:
+            columns += [
+                Booking.start_time.label("booking_start_time"),
+                Booking.end_time.label("booking_end_time"),
+            ]
+        if ReviewInclude.SERVICE in include:
+            columns += [Service.id.label("service_id"), Service.title.label("service_title")]
+
+        query = select(*columns).join(Booking, Review.booking_id == Booking.id)
+        if ReviewInclude.REVIEWER in include:
+            query = query.join(User, Booking.user_id == User.id)
+        if ReviewInclude.SERVICE in include:
+            query = query.join(Service, Booking.service_id == Service.id)
+        return query
 
-        return db.query(Review).join(Booking).filter(
-            Booking.service_id == service_id
-        ).offset(skip).limit(limit).all()
+    @staticmethod
+    def get_service_reviews(db: Session, service_id: UUID, skip: int = 0, limit: int = 100,
+                            include: Optional[Set[ReviewInclude]] = None, fields: Optional[Set[str]] = None) -> list:
+        """Review mappings for a service; with `include`, related reviewer/booking/service columns come from the same query"""
+        query = ReviewCRUD._list_statement(include, fields).where(Booking.service_id == service_id).offset(skip).limit(limit)
+        return db.execute(query).mappings().all()
 
     @staticmethod
-    def create_review(db: Session, review_data: ReviewCreate, user_id: UUID) -> Review:
+    def create_review(db: Session, review_data: ReviewCreate, user_id: UUID, commit: bool = True) -> Review:
+        """Check eligibility and insert in one statement.
+
+        The target booking is selected in a CTE, the insert only fires for the owner's
+        COMPLETED booking and skips duplicates via ON CONFLICT (booking_id), and the
+        outer select returns the booking columns alongside the inserted row (if any)
+        so a failed insert can be explained without another query. With `commit=False` the
+        caller commits, and the leaderboard/cache updates wait for that commit.
+        """
+        review_id = uuid.uuid4()
+
+        target_booking = select(
+            Booking.id, Booking.user_id, Booking.status, Booking.service_id
+        ).where(Booking.id == review_data.booking_id).cte("target_booking")
+
+        inserted_review = pg_insert(Review).from_select(
+            ["id", "booking_id", "rating", "comment"],
+            select(
+                literal(review_id, Review.id.type),
+                target_booking.c.id,
+                literal(review_data.rating, Review.rating.type),
+                literal(review_data.comment, Review.comment.type),
+            ).where(
+                target_booking.c.user_id == user_id,
+                target_booking.c.status == BookingStatus.COMPLETED,
+            )
+        ).on_conflict_do_nothing(index_elements=[Review.booking_id]).returning(
+            Review.id, Review.created_at
+        ).cte("inserted_review")
+
+        statement = select(
+            target_booking.c.user_id,
+            target_booking.c.status,
+            target_booking.c.service_id,
+            inserted_review.c.id.label("review_id"),
+            inserted_review.c.created_at,
+        ).select_from(target_booking.outerjoin(inserted_review, true()))
 
+        try:
+            row = db.execute(statement).first()
+            if commit:
+                db.commit()
+        except OperationalError:
+            db.rollback()
+            raise
+        except Exception as e:
+            db.rollback()
+            raise ValueError(f"Failed to create review: {str(e)}")
 
-        booking = db.query(Booking).filter(Booking.id == review_data.booking_id).first()
-        if not booking:
+        if row is None:
             raise ValueError("Booking not found")
 
-
-        if booking.user_id != user_id:
-            raise ValueError("You can only review your own bookings")
-
-
-        if booking.status != BookingStatus.COMPLETED:
-            raise ValueError("You can only review completed bookings")
-
-
-        existing_review = ReviewCRUD.get_review_by_booking_id(db, review_data.booking_id)
-        if existing_review:
+        if row.review_id is None:
+            if row.user_id != user_id:
+                raise ValueError("You can only review your own bookings")
+            if row.status != BookingStatus.COMPLETED:
+                raise ValueError("You can only review completed bookings")
             raise ValueError("Review already exists for this booking")
 
+        def publish(*_):
+            service_leaderboard.apply_review_change(row.service_id, 1, review_data.rating)
+            response_cache.invalidate("reviews")
+
+        if commit:
+            publish()
+        else:
+            event.listen(db, "after_commit", publish, once=True)
 
-        new_review = Review(
+        return Review(
+            id=row.review_id,
             booking_id=review_data.booking_id,
             rating=review_data.rating,
-            comment=review_data.comment
+            comment=review_data.comment,
+            created_at=row.created_at
         )
 
-        try:
-            db.add(new_review)
-            db.commit()
-            db.refresh(new_review)
-            return new_review
-        except IntegrityError as e:
-            db.rollback()
-            if "unique constraint" in str(e).lower():
-                raise ValueError("Review already exists for this booking")
-            raise ValueError(f"Failed to create review: {str(e)}")
-        except Exception as e:
-            db.rollback()
-            raise ValueError(f"Failed to create review: {str(e)}")
-
     @staticmethod
     def update_review(db: Session, review_id: UUID, review_update: ReviewUpdate, user_id: Optional[UUID] = None,
                       is_admin: bool = False) -> Optional[Review]:
@@ -85,6 +151,7 @@ class ReviewCRUD:
 
 
         update_data = review_update.model_dump(exclude_unset=True)
+        old_rating = review.rating
 
         try:
             for field, value in update_data.items():
@@ -92,7 +159,13 @@ class ReviewCRUD:
 
             db.commit()
             db.refresh(review)
+            if review.rating != old_rating:
+                service_leaderboard.apply_review_change(review.booking.service_id, 0, review.rating - old_rating)
+            response_cache.invalidate("reviews")
             return review
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise ValueError(f"Failed to update review: {str(e)}")
@@ -110,37 +183,80 @@ class ReviewCRUD:
             if not booking or booking.user_id != user_id:
                 raise ValueError("Not authorized to delete this review")
 
+        service_id = review.booking.service_id
+        rating = review.rating
+
         try:
             db.delete(review)
             db.commit()
+            service_leaderboard.apply_review_change(service_id, -1, -rating)
+            response_cache.invalidate("reviews")
             return True
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise ValueError(f"Failed to delete review: {str(e)}")
 
     @staticmethod
-    def get_user_reviews(db: Session, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Review]:
+    def get_user_reviews(db: Session, user_id: UUID, skip: int = 0, limit: int = 100,
+                         include: Optional[Set[ReviewInclude]] = None, fields: Optional[Set[str]] = None) -> list:
 
-        return db.query(Review).join(Booking).filter(
-            Booking.user_id == user_id
-        ).offset(skip).limit(limit).all()
+        query = ReviewCRUD._list_statement(include, fields).where(Booking.user_id == user_id).offset(skip).limit(limit)
+        return db.execute(query).mappings().all()
 
     @staticmethod
-    def get_service_review_stats(db: Session, service_id: UUID) -> dict:
+    def _stats_columns():
+        """Aggregate columns for review count, average and the 1-5 star histogram"""
+        return [
+            func.count(Review.id).label("total_reviews"),
+            func.avg(Review.rating).label("average_rating"),
+            *[
+                func.count(Review.id).filter(Review.rating == rating).label(f"rating_{rating}")
+                for rating in range(1, 6)
+            ],
+        ]
 
-        reviews = ReviewCRUD.get_service_reviews(db, service_id)
+    @staticmethod
+    def _stats_from_row(row) -> dict:
 
-        if not reviews:
+        if row is None or not row.total_reviews:
             return {
                 "total_reviews": 0,
-                "average_rating": 0.0
+                "average_rating": 0.0,
+                "rating_distribution": {rating: 0 for rating in range(1, 6)}
             }
 
-        total_reviews = len(reviews)
-        total_rating = sum(review.rating for review in reviews)
-        average_rating = round(total_rating / total_reviews, 2)
-
         return {
-            "total_reviews": total_reviews,
-            "average_rating": average_rating
-        }
\ No newline at end of file
+            "total_reviews": row.total_reviews,
+            "average_rating": round(float(row.average_rating), 2),
+            "rating_distribution": {rating: getattr(row, f"rating_{rating}") for rating in range(1, 6)}
+        }
+
+    @staticmethod
+    def get_service_review_stats(db: Session, service_id: UUID) -> dict:
+        """Count, average and star distribution for one service in a single aggregate query"""
+        row = db.query(*ReviewCRUD._stats_columns()).join(Booking, Review.booking_id == Booking.id).filter(
+            Booking.service_id == service_id
+        ).one()
+
+        return ReviewCRUD._stats_from_row(row)
+
+    @staticmethod
+    def get_services_review_stats(db: Session, service_ids: List[UUID]) -> Dict[UUID, dict]:
+        """Review stats for many services with one grouped query; services without reviews get zeroed stats"""
+        stats = {service_id: ReviewCRUD._stats_from_row(None) for service_id in service_ids}
+        if not service_ids:
+            return stats
+
+        rows = db.query(Booking.service_id, *ReviewCRUD._stats_columns()).join(
+            Booking, Review.booking_id == Booking.id
+        ).filter(
+            Booking.service_id.in_(service_ids)
+        ).group_by(Booking.service_id).all()
+
+        for row in rows:
+            stats[row.service_id] = ReviewCRUD._stats_from_row(row)
+
+        return stats
@@ -1,16 +1,39 @@
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import List, Optional, Set
 from uuid import UUID
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import JSON, Numeric, cast, func, or_, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.exc import OperationalError
+from core.fields import narrow_columns
+from core.response_cache import response_cache
+from crud.leaderboard import service_leaderboard
 from models.service import Service
-from schema.service import ServiceCreate, ServiceUpdate, ServiceQuery
+from schema.service import ServiceCreate, ServiceUpdate, ServiceQuery, ServiceFacet
+
+FACET_COLUMNS = {
+    ServiceFacet.PRICE: "price",
+    ServiceFacet.DURATION: "duration_minutes",
+}
+
+# what ServiceResponse needs plus the row version for ETags; list reads select these instead of building Service objects
+LIST_COLUMNS = (
+    Service.id, Service.title, Service.description, Service.price,
+    Service.duration_minutes, Service.is_active, Service.created_at, Service.updated_at,
+)
+# newest first; id breaks ties so offset pages never repeat or skip a service
+ORDER_COLUMNS = (Service.created_at, Service.id)
+
+
+def _search_order(source) -> list:
+    return [source.c.created_at.desc(), source.c.id]
 
 
 class ServiceCRUD:
     @staticmethod
     def get_service_by_id(db:Session, id: UUID) -> Optional[Service]:
-        return db.query(Service).filter(Service.id == id).first()
+        return db.query(Service).filter(Service.id == id, Service.deleted_at.is_(None)).first()
 
     @staticmethod
     def create_service(db: Session, service: ServiceCreate):
@@ -21,24 +44,29 @@ class ServiceCRUD:
             db.add(new_service)
             db.commit()
             db.refresh(new_service)
+            service_leaderboard.invalidate()
+            response_cache.invalidate("services")
             return new_service
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise ValueError(f"Failed to create service: {str(e)}")
 
     @staticmethod
-    def search(db: Session, query_params: ServiceQuery, skip: int = 0, limit: int = 100):
-        """Search and filter services based on query parameters"""
-        query = db.query(Service)
+    def _search_filters(query_params: ServiceQuery) -> list:
+        # soft-deleted services never show up in searches
+        filters = [Service.deleted_at.is_(None)]
 
         # Filter by active status
         if query_params.active is not None:
-            query = query.filter(Service.is_active == query_params.active)
+            filters.append(Service.is_active == query_params.active)
 
         # Search by title or description
         if query_params.q:
             search_term = f"%{query_params.q}%"
-            query = query.filter(
+            filters.append(
                 or_(
                     Service.title.ilike(search_term),
                     Service.description.ilike(search_term)
@@ -46,12 +74,98 @@ class ServiceCRUD:
             )
 
         if query_params.price_min is not None:
-            query = query.filter(Service.price >= query_params.price_min)
+            filters.append(Service.price >= query_params.price_min)
 
         if query_params.price_max is not None:
-            query = query.filter(Service.price <= query_params.price_max)
+            filters.append(Service.price <= query_params.price_max)
+
+        return filters
+
+    @staticmethod
+    def search(db: Session, query_params: ServiceQuery, skip: int = 0, limit: int = 100,
+               facets: Optional[Set[ServiceFacet]] = None, facet_buckets: int = 5,
+               fields: Optional[Set[str]] = None):
+        """Search and filter services based on query parameters.
+
+        Without `facets` this returns the matching services as LIST_COLUMNS mappings. With `facets`
+        it returns {"items", "total", "facets"}, all computed by one statement over the same filters.
+        `fields` limits the selected columns to those (plus id and updated_at for the ETag).
+        """
+        columns = narrow_columns(LIST_COLUMNS, fields, always=("id", "updated_at"))
+        if facets:
+            return ServiceCRUD._search_with_facets(db, query_params, skip, limit, facets, facet_buckets, columns)
+
+        return db.execute(
+            select(*columns).where(*ServiceCRUD._search_filters(query_params))
+            .order_by(*_search_order(Service.__table__)).offset(skip).limit(limit)
+        ).mappings().all()
+
+    @staticmethod
+    def _facet_histogram(filtered, column_name: str, buckets: int):
+        """JSON array of equal-width buckets (min/max/count) over a column of the filtered CTE"""
+        value = cast(filtered.c[column_name], Numeric)
+
+        bounds = select(
+            func.min(value).label("low"),
+            func.greatest(func.max(value), func.min(value) + 1).label("high"),
+        ).select_from(filtered).subquery(f"{column_name}_bounds")
+
+        # width_bucket puts the maximum itself in bucket n+1, so clamp it into the last bucket
+        bucket = func.least(func.width_bucket(value, bounds.c.low, bounds.c.high, buckets), buckets)
+        counts = select(
+            bucket.label("bucket"),
+            func.count().label("count"),
+            bounds.c.low,
+            bounds.c.high,
+        ).select_from(filtered.join(bounds, true())).group_by(
+            bucket, bounds.c.low, bounds.c.high
+        ).subquery(f"{column_name}_buckets")
+
+        width = (counts.c.high - counts.c.low) / buckets
+        return select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(
+                    func.json_build_object(
+                        "min", counts.c.low + (counts.c.bucket - 1) * width,
+                        "max", counts.c.low + counts.c.bucket * width,
+                        "count", counts.c.count,
+                    ),
+                    counts.c.bucket,
+                )),
+                cast("[]", JSON),
+            )
+        ).scalar_subquery()
+
+    @staticmethod
+    def _search_with_facets(db: Session, query_params: ServiceQuery, skip: int, limit: int,
+                            facets: Set[ServiceFacet], facet_buckets: int, columns: list) -> dict:
+
+        # the CTE is read several times, so it only carries the page columns, the sort key and what the facets bucket
+        extra_columns = list(ORDER_COLUMNS) + [Service.__table__.c[FACET_COLUMNS[facet]] for facet in facets]
+        page_keys = {column.key for column in columns}
+        filtered_columns = columns + [column for column in dict.fromkeys(extra_columns) if column.key not in page_keys]
+        filtered = select(*filtered_columns).where(*ServiceCRUD._search_filters(query_params)).cte("filtered_services")
+        page = select(*[filtered.c[column.key] for column in columns], *[
+            filtered.c[column.key] for column in ORDER_COLUMNS if column.key not in page_keys
+        ]).order_by(*_search_order(filtered)).offset(skip).limit(limit).subquery("page")
+
+        meta_columns = [select(func.count()).select_from(filtered).scalar_subquery().label("total")]
+        for facet in facets:
+            meta_columns.append(
+                ServiceCRUD._facet_histogram(filtered, FACET_COLUMNS[facet], facet_buckets).label(f"{facet.value}_facet")
+            )
+        meta = select(*meta_columns).subquery("meta")
 
-        return query.offset(skip).limit(limit).all()
+        # outer join so total and facets still come back when the page is empty
+        page_columns = [page.c[column.key] for column in columns]
+        statement = select(*page_columns, meta).select_from(meta.outerjoin(page, true())).order_by(*_search_order(page))
+        rows = db.execute(statement).mappings().all()
+
+        return {
+            "items": [row for row in rows if row["id"] is not None],
+            "total": rows[0]["total"],
+            "facets": {facet.value: rows[0][f"{facet.value}_facet"] for facet in facets},
+        }
 
     @staticmethod
     def update_service(db: Session, service_id: UUID, service_update: ServiceUpdate) -> Optional[Service]:
@@ -67,22 +181,34 @@ class ServiceCRUD:
 
             db.commit()
             db.refresh(db_service)
+            service_leaderboard.invalidate()
+            # review listings embed the service via include=service
+            response_cache.invalidate("services", "reviews")
             return db_service
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise ValueError(f"Failed to update service: {str(e)}")
 
     @staticmethod
-    def remove(db: Session, service_id: UUID):
-        service = db.query(Service).get(service_id)
-
+    def soft_delete(db: Session, service_id: UUID) -> Optional[Service]:
+        """Hide a service immediately; the purge worker archives it and its history later"""
+        service = ServiceCRUD.get_service_by_id(db, service_id)
         if not service:
             return None
 
         try:
-            db.delete(service)
+            service.deleted_at = datetime.now(timezone.utc)
+            service.is_active = False
             db.commit()
+            service_leaderboard.invalidate()
+            response_cache.invalidate("services", "reviews")
             return service
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
-            raise ValueError(f"Failed to delete service: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Failed to delete service: {str(e)}")
@@ -1,9 +1,16 @@
+import logging
 from typing import Optional
 from uuid import UUID
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import OperationalError
 from models.user import User
 from schema.user import UserCreate, UserUpdate
-from core.security import hash_password, verify_password
+from core.response_cache import response_cache
+from core.security import hash_password, verify_and_update_password, principal_cache
+
+logger = logging.getLogger(__name__)
 
 
 class UserCRUD:
@@ -13,22 +20,26 @@ class UserCRUD:
 
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
-        return db.query(User).filter(User.email == email).first()
+        return db.query(User).filter(func.lower(User.email) == email.lower()).first()
 
     @staticmethod
     def create_user(db: Session, user: UserCreate) -> User:
-        available_user = UserCRUD.get_user_by_email(db, user.email)
-        if available_user:
-            raise ValueError("email already registered")
+        # one round trip: the case-insensitive unique index decides whether the email is taken
         user_data = user.model_dump(exclude={"password"})
-        new_user = User(**user_data, password_hash=hash_password(user.password))
+        statement = pg_insert(User).values(
+            **user_data, password_hash=hash_password(user.password)
+        ).on_conflict_do_nothing(index_elements=[func.lower(User.email)]).returning(User)
         try:
-            db.add(new_user)
+            new_user = db.scalars(statement).one_or_none()
             db.commit()
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise ValueError(f"Failed to create user: {str(e)}")
-        db.refresh(new_user)
+        if new_user is None:
+            raise ValueError("email already registered")
         return new_user
 
     @staticmethod
@@ -36,8 +47,19 @@ class UserCRUD:
         user = UserCRUD.get_user_by_email(db, email)
         if not user:
             return None
-        if not verify_password(password, user.password_hash):
+        is_valid, new_hash = verify_and_update_password(password, user.password_hash)
+        if not is_valid:
             return None
+
+        # stored hash uses an old bcrypt cost; the plain password is at hand, so rehash now
+        if new_hash:
+            try:
+                user.password_hash = new_hash
+                db.commit()
+                db.refresh(user)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"failed to rehash password for user {user.id}: {e}")
         return user
 
     @staticmethod
@@ -61,7 +83,13 @@ class UserCRUD:
         try:
             db.commit()
             db.refresh(user)
+            principal_cache.invalidate(user.id)
+            # reviewer names are embedded in cached review listings
+            response_cache.invalidate("reviews")
             return user
+        except OperationalError:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise ValueError(f"Failed to update user: {str(e)}")
@@ -1,23 +1,68 @@
 import os
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
 
 from api.router.auth import auth_router
+from api.router.batch import batch_router
 from api.router.booking import booking_router
 from api.router.service import service_router
 from api.router.user import user_router
 from api.router.review import review_router
+from core.admission import AdmissionControlMiddleware
+from core.compression import CompressionMiddleware
+from core.hashing import HashingBusyError, hashing_executor
+from core.idempotency import idempotency_store
+from core.metrics import metrics
+from core.response_cache import CacheRule, ResponseCacheMiddleware, response_cache, \
+    RESPONSE_CACHE_REVIEWS_TTL_SECONDS, RESPONSE_CACHE_SERVICES_TTL_SECONDS
+from core.revocation import revocation_store
+from core.threadpool import configure_threadpool
+from core.timeouts import QueryCancellationMiddleware, database_timeout_handler
+from crud.purge import PURGE_ENABLED, service_purge_worker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_threadpool()
+    if PURGE_ENABLED:
+        service_purge_worker.start()
+    revocation_store.start()
+    idempotency_store.start()
+    yield
+    idempotency_store.stop()
+    revocation_store.stop()
+    service_purge_worker.stop()
+    hashing_executor.shutdown()
 
 
 app = FastAPI(title="BookIt API",
     description="A simple bookings platform API",
-    version="1.0.0")
+    version="1.0.0",
+    lifespan=lifespan)
 
 if os.getenv("DEBUG") == "False":
     app.docs_url = "/docs"  # Keep docs available
     app.redoc_url = "/redoc"
 
+# anonymous reads that return the same bytes to everyone; CRUD writes invalidate by tag
+response_cache.rules = [
+    CacheRule("/services/", RESPONSE_CACHE_SERVICES_TTL_SECONDS, "services"),
+    CacheRule("/services/{service_id}", RESPONSE_CACHE_SERVICES_TTL_SECONDS, "services"),
+    CacheRule("/services/stats", RESPONSE_CACHE_REVIEWS_TTL_SECONDS, "reviews"),
+    CacheRule("/reviews/services/{service_id}/reviews", RESPONSE_CACHE_REVIEWS_TTL_SECONDS, "reviews"),
+    CacheRule("/reviews/services/{service_id}/stats", RESPONSE_CACHE_REVIEWS_TTL_SECONDS, "reviews"),
+]
+# innermost: only requests that reach a route (not cache hits or shed requests) need a disconnect watcher
+app.add_middleware(QueryCancellationMiddleware)
+# inside the response cache: hits are answered without a slot, so cheap reads keep flowing while writes queue
+app.add_middleware(AdmissionControlMiddleware)
+# added before CORS so it sits inside it: CORS headers depend on the caller's Origin and must not be cached
+app.add_middleware(ResponseCacheMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
 allow_origins=["*"],
@@ -25,12 +70,30 @@ allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# outermost, so everything above is compressed once on the way out; precompressed cache hits pass through
+app.add_middleware(CompressionMiddleware)
+
+@app.exception_handler(HashingBusyError)
+async def hashing_busy_handler(request: Request, exc: HashingBusyError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+app.add_exception_handler(OperationalError, database_timeout_handler)
+
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(service_router)
 app.include_router(booking_router)
 app.include_router(review_router)
+app.include_router(batch_router)
 
 @app.get("/")
 async def root():
     return {"message": "BookIt API is running!"}
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return metrics.snapshot()
@@ -2,5 +2,9 @@ from .user import User
 from .service import Service
 from .booking import Booking
 from .review import Review
+from .archive import ArchivedService, ArchivedBooking, ArchivedReview
+from .revoked_token import RevokedToken
+from .refresh_token import RefreshToken
+from .idempotency_key import IdempotencyKey
 
-__all__ = ["User", "Service", "Booking", "Review"]
\ No newline at end of file
+__all__ = ["User", "Service", "Booking", "Review", "ArchivedService", "ArchivedBooking", "ArchivedReview", "RevokedToken", "RefreshToken", "IdempotencyKey"]
\ No newline at end of file
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, String, Boolean, DateTime, DECIMAL, Integer
+from sqlalchemy.dialects.postgresql import ENUM, UUID
+from sqlalchemy.sql import func
+from core.database import Base
+from models.booking import BookingStatus
+
+
+# Copies of purged rows. No foreign keys so history survives the live rows being deleted.
+
+class ArchivedService(Base):
+    __tablename__ = "archived_services"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    title = Column(String(200), nullable=False)
+    description = Column(String(750), nullable=False)
+    price = Column(DECIMAL(precision=10, scale=2), nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    is_active = Column(Boolean)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    deleted_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ArchivedBooking(Base):
+    __tablename__ = "archived_bookings"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    service_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    status = Column(ENUM(BookingStatus, name="booking_status", create_type=False), nullable=False)  # reuses the bookings enum type
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ArchivedReview(Base):
+    __tablename__ = "archived_reviews"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    booking_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    rating = Column(Integer, nullable=False)
+    comment = Column(String(1000), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
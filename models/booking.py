@@ -18,14 +18,17 @@ class Booking(Base):
     __tablename__ = "bookings"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-    service_id = Column(UUID(as_uuid=True), ForeignKey("services.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    service_id = Column(UUID(as_uuid=True), ForeignKey("services.id", ondelete="CASCADE"), nullable=False, index=True)
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=False)
     status = Column(Enum(BookingStatus, name="booking_status"), nullable=False, default=BookingStatus.PENDING)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # row version for ETag / Last-Modified
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
 
     user = relationship("User", back_populates="bookings")
     service = relationship("Service", back_populates="bookings")
-    review = relationship("Review", back_populates="booking", uselist=False)
\ No newline at end of file
+    review = relationship("Review", back_populates="booking", uselist=False, cascade="all, delete-orphan",
+                          passive_deletes=True)
\ No newline at end of file
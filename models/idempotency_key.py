@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, JSON, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from core.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    route = Column(String(64), primary_key=True)  # e.g. "POST /bookings"; the same key may be reused across routes
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request body, so a reused key with a new body is caught
+    status_code = Column(Integer, nullable=True)  # NULL while the first request is still running
+    response_body = Column(LargeBinary, nullable=True)
+    response_headers = Column(JSON, nullable=True)  # e.g. Retry-After on a stored 4xx
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # rows are pruned after this
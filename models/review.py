@@ -10,7 +10,7 @@ class Review(Base):
     __tablename__ = "reviews"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=False, unique=True)
+    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False, unique=True)
     rating = Column(Integer, nullable=False)  # 1-5 per PRD
     comment = Column(String(1000), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
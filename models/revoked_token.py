@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from core.database import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(36), primary_key=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # rows are pruned after this
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
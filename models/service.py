@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, String, Boolean, DateTime, DECIMAL, Integer, func
+from sqlalchemy import Column, String, Boolean, DateTime, DECIMAL, Integer, Index, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -15,6 +15,15 @@ class Service(Base):
     duration_minutes = Column(Integer,nullable=False)
     is_active = Column (Boolean, default=True, index = True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # row version for ETag / Last-Modified
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # soft delete, purged to archive tables later
 
-    bookings = relationship("Booking", back_populates="service", cascade = "all, delete-orphan")
+    # bookings (and their reviews) are removed by ON DELETE CASCADE, so the ORM never loads them just to delete them
+    bookings = relationship("Booking", back_populates="service", cascade = "all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # searches only ever look at live rows, so keep that index small
+        Index("ix_services_live_active_price", "is_active", "price", postgresql_where=deleted_at.is_(None)),
+    )
 
@@ -0,0 +1,27 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+from core.batch import BATCH_MAX_REQUESTS
+
+
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = Field(None, description="Echoed back on the matching response")
+    method: str = Field("GET", pattern="^(GET|POST|PATCH|PUT|DELETE)$")
+    path: str = Field(..., pattern="^/", description="Path with optional query string, e.g. /services/?limit=5")
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem] = Field(..., min_length=1, max_length=BATCH_MAX_REQUESTS)
+
+
+class BatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResponseItem]
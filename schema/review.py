@@ -1,5 +1,6 @@
+import enum
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 from uuid import UUID
 from pydantic import BaseModel, Field
 
@@ -24,4 +25,38 @@ class ReviewResponse(ReviewBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ReviewInclude(str, enum.Enum):
+    REVIEWER = "reviewer"
+    BOOKING = "booking"
+    SERVICE = "service"
+
+
+# ReviewDetailResponse fields that only carry data when their relation is included
+INCLUDE_FIELDS = {
+    ReviewInclude.REVIEWER: ("reviewer_id", "reviewer_name"),
+    ReviewInclude.BOOKING: ("booking_start_time", "booking_end_time"),
+    ReviewInclude.SERVICE: ("service_id", "service_title"),
+}
+
+
+class ReviewDetailResponse(ReviewResponse):
+    """Review plus the related fields requested through `include=`"""
+    reviewer_id: Optional[UUID] = None
+    reviewer_name: Optional[str] = None
+    booking_start_time: Optional[datetime] = None
+    booking_end_time: Optional[datetime] = None
+    service_id: Optional[UUID] = None
+    service_title: Optional[str] = None
+
+
+class ReviewStats(BaseModel):
+    total_reviews: int
+    average_rating: float
+    rating_distribution: Dict[int, int] = Field(..., description="Number of reviews per star rating (1-5)")
+
+
+class ServiceReviewStats(ReviewStats):
+    service_id: UUID
@@ -1,8 +1,10 @@
+import enum
+from functools import lru_cache
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, List, Optional, Type
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 
 
 class ServiceBase(BaseModel):
@@ -33,8 +35,38 @@ class ServiceResponse(ServiceBase):
         from_attributes = True
 
 
+class TopServiceResponse(ServiceResponse):
+    total_reviews: int
+    average_rating: float
+    weighted_rating: float = Field(..., description="Bayesian average pulled toward the global mean for services with few reviews")
+
+
 class ServiceQuery(BaseModel):
     q: Optional[str] = Field(None, description="Search query for title/description")
     price_min: Optional[Decimal] = Field(None, ge=0, description="Minimum price filter")
     price_max: Optional[Decimal] = Field(None, ge=0, description="Maximum price filter")
-    active: Optional[bool] = Field(True, description="Filter by active status")
\ No newline at end of file
+    active: Optional[bool] = Field(True, description="Filter by active status")
+
+
+class ServiceFacet(str, enum.Enum):
+    PRICE = "price"
+    DURATION = "duration"
+
+
+class FacetBucket(BaseModel):
+    min: float
+    max: float
+    count: int
+
+
+class ServiceSearchResponse(BaseModel):
+    items: List[ServiceResponse]
+    total: int
+    facets: Dict[ServiceFacet, List[FacetBucket]]
+
+
+@lru_cache(maxsize=None)
+def service_search_response(item_model: Type[BaseModel]) -> Type[ServiceSearchResponse]:
+    """ServiceSearchResponse whose items are `item_model` (a `fields=` subset of ServiceResponse)"""
+    return create_model(f"ServiceSearchResponse{item_model.__name__}", __base__=ServiceSearchResponse,
+                        items=(List[item_model], ...))
@@ -27,6 +27,17 @@ class UserResponse(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserPrincipal(BaseModel):
+    """What protected routes know about the caller; cached between requests instead of a full User row"""
+    id: UUID
+    name: str
+    email: str
+    role: Roles
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str = Field(..., min_length=1)
\ No newline at end of file
@@ -13,6 +13,8 @@ from models.service import Service
 from models.booking import Booking, BookingStatus
 from models.review import Review
 from core.security import hash_password
+from core.ratelimit import rate_limiter
+from core.response_cache import response_cache
 import uuid
 from datetime import datetime, timedelta, timezone
 
@@ -33,6 +35,11 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# the suite logs in far more often than any client should; TestRateLimiting turns it back on
+rate_limiter.enabled = False
+# fixtures write straight to the database, bypassing the CRUD invalidation hooks
+response_cache.enabled = False
+
 @pytest.fixture(scope="session")
 def setup_database():
 
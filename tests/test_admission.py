@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from core.admission import AdmissionControlMiddleware, AdmissionGroup
+
+
+def build_app(write_spec="1/1/0.2"):
+
+    groups = [
+        AdmissionGroup("test_write", write_spec, methods=("POST",)),
+        AdmissionGroup("test_read", "4/4/1", methods=("GET",)),
+    ]
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, groups=groups, enabled=True)
+
+    @app.post("/slow")
+    async def slow(seconds: float = 0.3):
+        await asyncio.sleep(seconds)
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    return app, groups
+
+
+def run(app, *requests):
+
+    async def send_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.request(method, url) for method, url in requests))
+
+    return asyncio.run(send_all())
+
+
+def test_full_queue_is_rejected_and_reads_are_unaffected():
+
+    app, groups = build_app()
+
+    responses = run(app, *[("POST", "/slow")] * 3, *[("GET", "/fast")] * 3)
+
+    write_statuses = sorted(response.status_code for response in responses[:3])
+    # one running, one queued until its deadline passes, one turned away at once
+    assert write_statuses == [200, 503, 503]
+    assert all(response.headers.get("Retry-After") == "1" for response in responses[:3] if response.status_code == 503)
+    assert [response.status_code for response in responses[3:]] == [200, 200, 200]
+    assert all(group.active == 0 for group in groups)
+
+
+def test_queued_request_gets_released_slot():
+
+    app, groups = build_app(write_spec="1/1/2")
+
+    responses = run(app, ("POST", "/slow?seconds=0.1"), ("POST", "/slow?seconds=0.1"))
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert groups[0].active == 0
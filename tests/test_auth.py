@@ -26,6 +26,14 @@ class TestAuthRegistration:
         assert response.status_code == status.HTTP_409_CONFLICT
         assert "email already registered" in response.json()["detail"].lower()
 
+    def test_register_duplicate_email_different_case(self, client, regular_user_data):
+
+        client.post("/auth/register", json=regular_user_data)
+
+        response = client.post("/auth/register", json={**regular_user_data, "email": regular_user_data["email"].upper()})
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
     def test_register_invalid_email(self, client):
 
         invalid_data = {
@@ -69,6 +77,16 @@ class TestAuthLogin:
         assert "user" in data
         assert data["user"]["email"] == regular_user_data["email"]
 
+    def test_login_email_is_case_insensitive(self, client, create_regular_user, regular_user_data):
+
+        login_data = {
+            "email": regular_user_data["email"].upper(),
+            "password": regular_user_data["password"]
+        }
+        response = client.post("/auth/login", json=login_data)
+
+        assert response.status_code == status.HTTP_200_OK
+
     def test_login_wrong_password(self, client, create_regular_user, regular_user_data):
 
         login_data = {
@@ -101,6 +119,25 @@ class TestAuthLogin:
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
+    def test_login_rehashes_password_with_outdated_cost(self, client, db, create_regular_user, regular_user_data):
+
+        from passlib.hash import bcrypt
+        from core.security import BCRYPT_ROUNDS
+
+        create_regular_user.password_hash = bcrypt.using(rounds=4).hash(regular_user_data["password"])
+        db.commit()
+
+        login_data = {
+            "email": regular_user_data["email"],
+            "password": regular_user_data["password"]
+        }
+        response = client.post("/auth/login", json=login_data)
+
+        assert response.status_code == status.HTTP_200_OK
+        db.refresh(create_regular_user)
+        assert create_regular_user.password_hash.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+
+
 class TestAuthProtectedRoutes:
 
 
@@ -176,6 +213,45 @@ class TestAuthTokenRefresh:
         assert "refresh_token" in data
         assert data["token_type"] == "bearer"
 
+    def test_refresh_token_rotation_and_reuse_detection(self, client, create_regular_user, regular_user_data):
+
+        login_data = {
+            "email": regular_user_data["email"],
+            "password": regular_user_data["password"]
+        }
+        first_token = client.post("/auth/login", json=login_data).json()["tokens"]["refresh_token"]
+
+        response = client.post("/auth/refresh", json={"refresh_token": first_token})
+        assert response.status_code == status.HTTP_200_OK
+        second_token = response.json()["refresh_token"]
+        assert second_token != first_token
+
+        response = client.post("/auth/refresh", json={"refresh_token": first_token})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert "reuse" in response.json()["detail"].lower()
+
+        response = client.post("/auth/refresh", json={"refresh_token": second_token})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_legacy_refresh_token_is_accepted_once(self, client, create_regular_user):
+
+        from core.security import create_refresh_token
+
+        # issued before rotation: no "fam" claim and no refresh_tokens row
+        legacy_token = create_refresh_token(data={"sub": str(create_regular_user.id)})
+
+        response = client.post("/auth/refresh", json={"refresh_token": legacy_token})
+        assert response.status_code == status.HTTP_200_OK
+        successor = response.json()["refresh_token"]
+
+        response = client.post("/auth/refresh", json={"refresh_token": legacy_token})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert "reuse" in response.json()["detail"].lower()
+
+        # the replay revokes the family it was moved into
+        response = client.post("/auth/refresh", json={"refresh_token": successor})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
     def test_refresh_token_invalid(self, client):
 
         refresh_data = {"refresh_token": "invalid_refresh_token"}
@@ -195,8 +271,150 @@ class TestAuthLogout:
         assert response.status_code == status.HTTP_200_OK
         assert "logout successful" in response.json()["message"].lower()
 
+    def test_logout_revokes_access_token(self, client, auth_headers):
+
+        response = client.post("/auth/logout", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = client.get("/users/me", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_logout_revokes_refresh_token(self, client, create_regular_user, regular_user_data):
+
+        login_data = {
+            "email": regular_user_data["email"],
+            "password": regular_user_data["password"]
+        }
+        tokens = client.post("/auth/login", json=login_data).json()["tokens"]
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+        response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_bloom_filter_has_no_false_negatives(self):
+
+        from core.revocation import BloomFilter
+
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+        assert sum(f"other-{i}" in bloom for i in range(1000)) < 50
+
     def test_logout_without_token(self, client):
 
         response = client.post("/auth/logout")
 
-        assert response.status_code == status.HTTP_403_FORBIDDEN
\ No newline at end of file
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestTokenVerificationCache:
+
+    def test_cached_token_still_checks_type(self):
+
+        from core.security import create_access_token, verify_token
+
+        token = create_access_token(data={"sub": "some-user"})
+
+        assert verify_token(token, token_type="access")["sub"] == "some-user"
+        assert verify_token(token, token_type="access")["sub"] == "some-user"
+        assert verify_token(token, token_type="refresh") is None
+
+    def test_expired_cache_entry_is_rejected(self):
+
+        from datetime import timedelta
+        from core.security import create_access_token, verify_token
+
+        token = create_access_token(data={"sub": "some-user"}, expires_delta=timedelta(seconds=-1))
+
+        assert verify_token(token) is None
+
+
+class TestPasswordHashingExecutor:
+
+    def test_saturated_executor_rejects(self):
+
+        import threading
+        from core.hashing import HashingBusyError, HashingExecutor
+
+        executor = HashingExecutor(kind="thread", workers=1, queue_size=0)
+        release = threading.Event()
+        worker = threading.Thread(target=executor.run, args=(release.wait,))
+        worker.start()
+
+        try:
+            with pytest.raises(HashingBusyError):
+                for _ in range(100):
+                    executor.run(lambda: None)
+                    threading.Event().wait(0.01)
+        finally:
+            release.set()
+            worker.join()
+            executor.shutdown()
+
+    def test_hash_and_verify_through_executor(self):
+
+        from core.security import hash_password, verify_password
+
+        hashed = hash_password("testpassword123")
+
+        assert verify_password("testpassword123", hashed)
+        assert not verify_password("wrongpassword", hashed)
+
+
+class TestRateLimiting:
+
+    def test_token_bucket_refills(self):
+
+        from core.ratelimit import InMemoryRateLimitBackend
+
+        backend = InMemoryRateLimitBackend()
+
+        assert backend.take("k", capacity=2, refill_per_second=1000)[0]
+        assert backend.take("k", capacity=2, refill_per_second=1000)[0]
+        allowed, retry_after = backend.take("k", capacity=2, refill_per_second=0.5)
+        assert not allowed
+        assert 0 < retry_after <= 2
+        assert backend.take("other", capacity=2, refill_per_second=0.5)[0]
+
+    def test_client_ip_ignores_client_written_forwarded_hops(self, monkeypatch):
+
+        from starlette.requests import Request
+        import core.ratelimit as ratelimit
+
+        request = Request({"type": "http", "client": ("10.0.0.1", 1234),
+                           "headers": [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7")]})
+
+        assert ratelimit.RateLimiter.client_ip(request) == "10.0.0.1"
+
+        monkeypatch.setattr(ratelimit, "RATE_LIMIT_TRUST_FORWARDED", True)
+        assert ratelimit.RateLimiter.client_ip(request) == "203.0.113.7"
+
+        monkeypatch.setattr(ratelimit, "RATE_LIMIT_TRUSTED_PROXIES", 3)
+        assert ratelimit.RateLimiter.client_ip(request) == "10.0.0.1"
+
+    def test_login_is_throttled_with_retry_after(self, client, regular_user_data):
+
+        from core.metrics import metrics
+        from core.ratelimit import InMemoryRateLimitBackend, POLICIES, rate_limiter
+
+        login_data = {"email": regular_user_data["email"], "password": "wrongpassword"}
+        backend, rate_limiter.backend = rate_limiter.backend, InMemoryRateLimitBackend()
+        rate_limiter.enabled = True
+        try:
+            for _ in range(POLICIES["auth"].capacity):
+                assert client.post("/auth/login", json=login_data).status_code == status.HTTP_401_UNAUTHORIZED
+
+            response = client.post("/auth/login", json=login_data)
+        finally:
+            rate_limiter.enabled = False
+            rate_limiter.backend = backend
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response.headers["Retry-After"]) >= 1
+        assert metrics.snapshot()["rate_limit_throttled_total:auth"] >= 1
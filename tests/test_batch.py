@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import status
+
+from core.batch import BATCH_MAX_REQUESTS
+
+
+def test_batch_returns_results_in_order(client, create_service, auth_headers):
+
+    response = client.post("/batch", json={"requests": [
+        {"id": "me", "path": "/users/me"},
+        {"id": "service", "path": f"/services/{create_service.id}"},
+        {"id": "bookings", "path": "/bookings/"},
+        {"id": "missing", "path": "/services/00000000-0000-0000-0000-000000000000"},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["responses"]
+    assert [item["id"] for item in results] == ["me", "service", "bookings", "missing"]
+    assert [item["status"] for item in results] == [200, 200, 200, 404]
+    assert results[1]["body"]["title"] == create_service.title
+    assert results[2]["body"] == []
+
+
+def test_batch_write_is_visible_to_later_reads(client, create_service, auth_headers):
+
+    start_time = datetime.now(timezone.utc) + timedelta(days=2)
+    response = client.post("/batch", json={"requests": [
+        {"method": "POST", "path": "/bookings/", "body": {
+            "service_id": str(create_service.id),
+            "start_time": start_time.isoformat(),
+            "end_time": (start_time + timedelta(hours=1)).isoformat(),
+        }},
+        {"path": "/bookings/"},
+    ]}, headers=auth_headers)
+
+    created, listed = response.json()["responses"]
+    assert created["status"] == status.HTTP_201_CREATED
+    assert [booking["id"] for booking in listed["body"]] == [created["body"]["id"]]
+
+
+def test_batch_sub_requests_are_authenticated_individually(client, create_service):
+
+    response = client.post("/batch", json={"requests": [
+        {"path": f"/services/{create_service.id}"},
+        {"path": "/users/me"},
+    ]}, headers={"Authorization": "Bearer invalid"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["status"] for item in response.json()["responses"]] == [200, 401]
+
+
+def test_batch_rejects_nested_batches(client, setup_database):
+
+    response = client.post("/batch", json={"requests": [{"method": "POST", "path": "/batch", "body": {"requests": []}}]})
+
+    assert response.json()["responses"][0]["status"] == status.HTTP_400_BAD_REQUEST
+
+
+def test_batch_size_is_limited(client, setup_database):
+
+    response = client.post("/batch", json={"requests": [{"path": "/"}] * (BATCH_MAX_REQUESTS + 1)})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
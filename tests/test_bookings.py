@@ -46,6 +46,50 @@ def test_create_booking_conflict(client, create_regular_user, create_service, cr
     assert "conflicts with existing booking" in response.json()["detail"]
 
 
+def test_create_booking_idempotent_replay(client, create_service, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}", "Idempotency-Key": "booking-retry-1"}
+    start_time = datetime.now(timezone.utc) + timedelta(days=3)
+    booking_data = {
+        "service_id": str(create_service.id),
+        "start_time": start_time.isoformat(),
+        "end_time": (start_time + timedelta(hours=1)).isoformat()
+    }
+
+    first = client.post("/bookings/", json=booking_data, headers=headers)
+    retry = client.post("/bookings/", json=booking_data, headers=headers)
+
+    assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert len(client.get("/bookings/", headers=headers).json()) == 1
+
+    # a stored client error is replayed too, without another conflict check
+    booking_data["start_time"] = (start_time - timedelta(days=10)).isoformat()
+    headers["Idempotency-Key"] = "booking-retry-2"
+    assert client.post("/bookings/", json=booking_data, headers=headers).status_code == status.HTTP_400_BAD_REQUEST
+    replay = client.post("/bookings/", json=booking_data, headers=headers)
+    assert replay.status_code == status.HTTP_400_BAD_REQUEST
+    assert replay.headers["idempotent-replayed"] == "true"
+
+
+def test_create_booking_idempotency_key_reused_with_new_body(client, create_service, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}", "Idempotency-Key": "booking-reused"}
+    start_time = datetime.now(timezone.utc) + timedelta(days=3)
+    booking_data = {
+        "service_id": str(create_service.id),
+        "start_time": start_time.isoformat(),
+        "end_time": (start_time + timedelta(hours=1)).isoformat()
+    }
+    assert client.post("/bookings/", json=booking_data, headers=headers).status_code == status.HTTP_201_CREATED
+
+    booking_data["end_time"] = (start_time + timedelta(hours=2)).isoformat()
+    response = client.post("/bookings/", json=booking_data, headers=headers)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 def test_create_booking_past_time(client, create_service, user_token):
 
     headers = {"Authorization": f"Bearer {user_token}"}
@@ -133,6 +177,16 @@ def test_get_booking_by_id_owner(client, create_booking, user_token):
     assert data["id"] == str(create_booking.id)
 
 
+def test_get_booking_by_id_not_modified(client, create_booking, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    etag = client.get(f"/bookings/{create_booking.id}", headers=headers).headers["ETag"]
+
+    response = client.get(f"/bookings/{create_booking.id}", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
 def test_get_booking_by_id_admin(client, create_booking, admin_token):
 
     headers = {"Authorization": f"Bearer {admin_token}"}
@@ -245,6 +299,36 @@ def test_get_bookings_with_filters(client, create_booking, admin_token):
         assert booking["status"] == BookingStatus.PENDING
 
 
+def test_get_bookings_sparse_fields(client, create_booking, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    response = client.get("/bookings/?fields=id,status", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"id": str(create_booking.id), "status": "pending"}]
+
+
+def test_get_bookings_invalid_field(client, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    response = client.get("/bookings/?fields=id,password_hash", headers=headers)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "password_hash" in response.json()["detail"]
+
+
+def test_get_bookings_inverted_date_range(client, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    response = client.get("/bookings/?from=2030-01-02T00:00:00&to=2030-01-01T00:00:00", headers=headers)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "to_date must be after from_date" in response.json()["detail"]
+
+
 def test_booking_validation_end_before_start(client, create_service, user_token):
 
     headers = {"Authorization": f"Bearer {user_token}"}
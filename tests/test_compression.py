@@ -0,0 +1,75 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from core.compression import ENCODERS, CompressionMiddleware, negotiate
+from core.response_cache import CachedResponse
+
+
+def build_client():
+
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/large")
+    def large():
+        return [{"title": f"Service {index}", "description": "x" * 50} for index in range(100)]
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    def image():
+        return PlainTextResponse("x" * 5000, media_type="image/svg+xml")
+
+    return TestClient(app)
+
+
+def test_negotiate_respects_quality():
+
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0, identity") is None
+    assert negotiate("*") is not None
+    assert negotiate("") is None
+
+
+def test_negotiate_prefers_highest_quality(monkeypatch):
+
+    # ENCODERS lists br before gzip whenever brotli is installed
+    monkeypatch.setattr("core.compression.ENCODERS", {"br": ENCODERS["gzip"], "gzip": ENCODERS["gzip"]})
+
+    assert negotiate("br;q=0.5, gzip;q=0.9") == "gzip"
+    assert negotiate("gzip;q=0.8, br") == "br"
+    assert negotiate("br, gzip") == "br"
+    assert negotiate("gzip;q=0.5, identity") is None
+
+
+def test_large_json_is_compressed():
+
+    client = build_client()
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(response.json()) == 100
+
+
+def test_small_and_disallowed_responses_are_not_compressed():
+
+    client = build_client()
+
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_cached_responses_store_precompressed_variants():
+
+    body = b'{"items": "' + b"x" * 4000 + b'"}'
+    cached = CachedResponse(200, [(b"content-type", b"application/json")], body, "services", 60)
+
+    assert gzip.decompress(cached.variants["gzip"]) == body
+    assert cached.size > len(body)
@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from core.response_cache import CacheRule, CachedResponse, InMemoryResponseCacheBackend, ResponseCache, \
+    ResponseCacheMiddleware
+
+
+def build_app():
+
+    cache = ResponseCache(InMemoryResponseCacheBackend(), enabled=True)
+    cache.rules = [CacheRule("/items/{item_id}", 60, "items")]
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+    calls = []
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        calls.append(item_id)
+        await asyncio.sleep(0.05)
+        return {"id": item_id, "version": len(calls)}
+
+    return app, cache, calls
+
+
+def run(app, *requests):
+
+    async def send_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(url, headers=headers) for url, headers in requests))
+
+    return asyncio.run(send_all())
+
+
+ITEM = "/items/9b2f7c8e-1d3a-4e5b-8c6d-7e8f9a0b1c2d"
+
+
+def test_concurrent_misses_are_coalesced():
+
+    app, cache, calls = build_app()
+
+    responses = run(app, *[(ITEM + "?b=2&a=1", {})] * 5)
+
+    assert len(calls) == 1
+    assert len({response.text for response in responses}) == 1
+    assert run(app, (ITEM + "?a=1&b=2", {}))[0].headers["X-Cache"] == "HIT"
+    assert len(calls) == 1
+
+
+def test_invalidate_and_authorized_requests_bypass():
+
+    app, cache, calls = build_app()
+
+    run(app, (ITEM, {}))
+    cache.invalidate("items")
+    assert run(app, (ITEM, {}))[0].json()["version"] == 2
+
+    run(app, (ITEM, {"Authorization": "Bearer token"}))
+    assert len(calls) == 3
+
+
+def test_lru_respects_byte_limit():
+
+    backend = InMemoryResponseCacheBackend(max_bytes=8000)
+    for index in range(10):
+        backend.set(str(index), CachedResponse(200, [], b"x" * 900, "items", 60))
+
+    assert backend.get("0") is None
+    assert backend.get("9") is not None
+    assert sum(1 for index in range(10) if backend.get(str(index))) <= 8
@@ -0,0 +1,122 @@
+import pytest
+from fastapi import status
+import uuid
+
+
+def test_create_review_success(client, create_completed_booking, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    review_data = {
+        "booking_id": str(create_completed_booking.id),
+        "rating": 5,
+        "comment": "Great service"
+    }
+
+    response = client.post("/reviews/", json=review_data, headers=headers)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()
+    assert data["booking_id"] == str(create_completed_booking.id)
+    assert data["rating"] == 5
+    assert "id" in data
+    assert "created_at" in data
+
+
+def test_create_review_duplicate(client, create_completed_booking, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    review_data = {
+        "booking_id": str(create_completed_booking.id),
+        "rating": 4,
+        "comment": "Nice"
+    }
+
+    client.post("/reviews/", json=review_data, headers=headers)
+    response = client.post("/reviews/", json=review_data, headers=headers)
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert "already exists" in response.json()["detail"]
+
+
+def test_create_review_booking_not_completed(client, create_booking, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    review_data = {
+        "booking_id": str(create_booking.id),
+        "rating": 4,
+        "comment": "Too early"
+    }
+
+    response = client.post("/reviews/", json=review_data, headers=headers)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "completed bookings" in response.json()["detail"]
+
+
+def test_create_review_booking_not_found(client, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    review_data = {
+        "booking_id": str(uuid.uuid4()),
+        "rating": 4,
+        "comment": "Missing booking"
+    }
+
+    response = client.post("/reviews/", json=review_data, headers=headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_create_review_other_users_booking(client, create_completed_booking, admin_token):
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    review_data = {
+        "booking_id": str(create_completed_booking.id),
+        "rating": 1,
+        "comment": "Not mine"
+    }
+
+    response = client.post("/reviews/", json=review_data, headers=headers)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_get_service_reviews_with_include(client, db, create_regular_user, create_service, create_completed_booking):
+
+    from models.review import Review
+
+    db.add(Review(booking_id=create_completed_booking.id, rating=5, comment="Great service"))
+    db.commit()
+
+    response = client.get(f"/reviews/services/{create_service.id}/reviews?include=reviewer,booking")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["reviewer_name"] == create_regular_user.name
+    assert "booking_start_time" in data[0]
+    assert "service_title" not in data[0]
+
+
+def test_get_service_reviews_fields_need_include(client, create_service):
+
+    url = f"/reviews/services/{create_service.id}/reviews"
+
+    response = client.get(url + "?fields=id,service_title")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "service_title" in response.json()["detail"]
+
+    response = client.get(url + "?fields=id,service_title&include=service")
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_get_service_reviews_invalid_include(client, create_service):
+
+    response = client.get(f"/reviews/services/{create_service.id}/reviews?include=password")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
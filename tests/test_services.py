@@ -122,6 +122,45 @@ def test_get_services_public(client, create_service):
     assert isinstance(data, list)
 
 
+def test_get_service_conditional_request(client, create_service, admin_token):
+
+    response = client.get(f"/services/{create_service.id}")
+    etag = response.headers["ETag"]
+    assert "Last-Modified" in response.headers
+
+    not_modified = client.get(f"/services/{create_service.id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.content == b""
+
+    since = client.get(f"/services/{create_service.id}", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+    assert since.status_code == status.HTTP_304_NOT_MODIFIED
+
+    client.patch(f"/services/{create_service.id}", json={"title": "Renamed"},
+                 headers={"Authorization": f"Bearer {admin_token}"})
+
+    changed = client.get(f"/services/{create_service.id}", headers={"If-None-Match": etag})
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.headers["ETag"] != etag
+
+
+def test_get_services_list_etag(client, create_service):
+
+    etag = client.get("/services/").headers["ETag"]
+
+    response = client.get("/services/", headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_get_services_sparse_fields(client, create_service):
+
+    response = client.get("/services/?fields=id,title,price")
+
+    assert response.status_code == status.HTTP_200_OK
+    for service in response.json():
+        assert set(service) == {"id", "title", "price"}
+
+
 def test_get_services_with_search(client, create_service):
 
     response = client.get("/services?q=Test")
@@ -215,4 +254,107 @@ def test_deactivate_service(client, create_service, admin_token):
 
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
-    assert data["is_active"] is False
\ No newline at end of file
+    assert data["is_active"] is False
+
+def test_get_services_review_stats(client, db, create_service, create_completed_booking):
+
+    from models.review import Review
+
+    db.add(Review(booking_id=create_completed_booking.id, rating=4, comment="Good service"))
+    db.commit()
+
+    other_id = str(uuid.uuid4())
+    response = client.get(f"/services/stats?ids={create_service.id}&ids={other_id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data) == 2
+    assert data[0]["service_id"] == str(create_service.id)
+    assert data[0]["total_reviews"] == 1
+    assert data[0]["average_rating"] == 4.0
+    assert data[0]["rating_distribution"]["4"] == 1
+    assert data[1]["service_id"] == other_id
+    assert data[1]["total_reviews"] == 0
+
+
+def test_get_services_review_stats_requires_ids(client):
+
+    response = client.get("/services/stats")
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_top_services(client, db, create_service, create_completed_booking):
+
+    from crud.leaderboard import service_leaderboard
+    from models.review import Review
+
+    service_leaderboard.invalidate()
+    db.add(Review(booking_id=create_completed_booking.id, rating=5, comment="Excellent"))
+    db.commit()
+
+    response = client.get("/services/top?limit=5")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data[0]["id"] == str(create_service.id)
+    assert data[0]["total_reviews"] == 1
+    assert data[0]["average_rating"] == 5.0
+    assert data[0]["weighted_rating"] <= 5.0
+
+
+def test_get_services_with_facets(client, create_service):
+
+    response = client.get("/services?facets=price,duration&facet_buckets=3")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] >= 1
+    assert isinstance(data["items"], list)
+    assert sum(bucket["count"] for bucket in data["facets"]["price"]) == data["total"]
+    assert sum(bucket["count"] for bucket in data["facets"]["duration"]) == data["total"]
+
+
+def test_get_services_invalid_facet(client):
+
+    response = client.get("/services?facets=colour")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_delete_service_is_soft_delete(client, db, create_completed_booking, admin_token):
+
+    from models.booking import Booking
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    service_id = create_completed_booking.service_id
+
+    response = client.delete(f"/services/{service_id}", headers=headers)
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert client.get(f"/services/{service_id}").status_code == status.HTTP_404_NOT_FOUND
+    assert all(service["id"] != str(service_id) for service in client.get("/services/?active=false").json())
+    db.expire_all()
+    assert db.query(Booking).filter(Booking.id == create_completed_booking.id).first() is not None
+
+
+def test_purge_moves_deleted_service_to_archive(db, create_completed_booking):
+
+    from crud.purge import ServicePurge
+    from crud.service import ServiceCRUD
+    from models.archive import ArchivedBooking, ArchivedReview, ArchivedService
+    from models.booking import Booking
+    from models.review import Review
+
+    db.add(Review(booking_id=create_completed_booking.id, rating=3, comment="Okay"))
+    db.commit()
+    service_id = create_completed_booking.service_id
+    ServiceCRUD.soft_delete(db, service_id)
+
+    ServicePurge.purge_service(db, service_id, batch_size=1)
+
+    db.expire_all()
+    assert db.query(Booking).filter(Booking.service_id == service_id).count() == 0
+    assert db.query(ArchivedService).filter(ArchivedService.id == service_id).count() == 1
+    assert db.query(ArchivedBooking).filter(ArchivedBooking.service_id == service_id).count() == 1
+    assert db.query(ArchivedReview).filter(ArchivedReview.booking_id == create_completed_booking.id).count() == 1
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from sqlalchemy.exc import OperationalError
+
+from core.database import timeout_policy
+from core.metrics import metrics
+from core.timeouts import LOCK_NOT_AVAILABLE, QUERY_CANCELED, QueryCancellationMiddleware, database_timeout_handler
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+def test_timeout_policy_by_route_group():
+
+    assert timeout_policy("GET", "/services/").name == "search"
+    assert timeout_policy("GET", "/bookings/").name == "listing"
+    assert timeout_policy("POST", "/bookings/").name == "write"
+    assert timeout_policy("GET", "/auth/me").name == "default"
+
+
+def test_timeout_errors_map_to_503_and_504():
+
+    request = Request({"type": "http", "method": "GET", "path": "/services/", "headers": [], "query_string": b""})
+
+    def error(pgcode):
+        return OperationalError("SELECT 1", {}, SimpleNamespace(pgcode=pgcode))
+
+    statement_timeout = asyncio.run(database_timeout_handler(request, error(QUERY_CANCELED)))
+    lock_timeout = asyncio.run(database_timeout_handler(request, error(LOCK_NOT_AVAILABLE)))
+
+    assert statement_timeout.status_code == 504
+    assert lock_timeout.status_code == 503
+    assert lock_timeout.headers["Retry-After"] == "1"
+
+
+def test_disconnect_cancel_is_not_counted_as_timeout():
+
+    request = Request({"type": "http", "method": "GET", "path": "/services/", "headers": [], "query_string": b"",
+                       "client_disconnected": True})
+    request.state.db_timeout_group = "search"
+    timeouts = metrics.counter("db_statement_timeouts_total:search")
+    before = timeouts.snapshot()
+
+    asyncio.run(database_timeout_handler(request, OperationalError("SELECT 1", {}, SimpleNamespace(pgcode=QUERY_CANCELED))))
+
+    assert timeouts.snapshot() == before
+
+
+def test_client_disconnect_cancels_running_query():
+
+    connection = FakeConnection()
+    app = FastAPI()
+    app.add_middleware(QueryCancellationMiddleware)
+
+    @app.get("/slow")
+    async def slow(request: Request):
+        # what get_db does for a session whose transaction is running a statement
+        session = SimpleNamespace(info={"cancel_lock": threading.Lock(), "dbapi_connection": connection})
+        request.scope["db_sessions"].append(session)
+        for _ in range(100):
+            if connection.cancelled.is_set():
+                return {"cancelled": True}
+            await asyncio.sleep(0.01)
+        return {"cancelled": False}
+
+    async def call():
+        messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+        sent = []
+
+        async def receive():
+            message = next(messages, None)
+            if message is not None:
+                return message
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/slow", "headers": [], "query_string": b"",
+                 "http_version": "1.1", "scheme": "http", "server": ("test", 80), "root_path": ""}
+        await app(scope, receive, send)
+        return sent
+
+    sent = asyncio.run(call())
+
+    assert connection.cancelled.is_set()
+    assert sent[-1]["body"] == b'{"cancelled":true}'
@@ -195,4 +195,17 @@ def test_user_profile_after_update_persists(client, user_token):
 
     data = get_response.json()
     assert data["name"] == "Persistent Name"
-    assert data["email"] == "persistent@example.com"
\ No newline at end of file
+    assert data["email"] == "persistent@example.com"
+
+
+def test_profile_reflects_update_after_cached_lookup(client, user_token):
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    assert client.get("/users/me", headers=headers).status_code == status.HTTP_200_OK
+    client.patch("/users/me", json={"name": "Renamed User"}, headers=headers)
+
+    response = client.get("/users/me", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["name"] == "Renamed User"